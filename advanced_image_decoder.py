@@ -1,4 +1,9 @@
 # Create: advanced_image_decoder.py
+from sadl import tournament
+from sadl.bytestats import byte_stats
+from sadl.pixels import unpack_pixels
+from sadl.results import ImageResult, save
+from sadl.rle import decode
 
 def analyze_data_structure(raw_data):
     """Analyze the structure of the compressed data"""
@@ -12,17 +17,9 @@ def analyze_data_structure(raw_data):
     if raw_data[0] == 0x42 and raw_data[1] == 0x6c:
         print("  ⚡ Potential custom format signature: 0x42 0x6c")
     
-    # Analyze byte sequences
-    sequences = []
-    current_seq = [raw_data[0]]
-    
-    for i in range(1, len(raw_data)):
-        if raw_data[i] == raw_data[i-1] + 2:  # Check for +2 patterns
-            current_seq.append(raw_data[i])
-        else:
-            if len(current_seq) > 2:
-                sequences.append(current_seq)
-            current_seq = [raw_data[i]]
+    # Analyze byte sequences: runs of +2 steps
+    stats = byte_stats(raw_data)
+    sequences = [stats.values[start:start + length].tolist() for start, length in stats.progressions(2)]
     
     if sequences:
         print(f"  Found {len(sequences)} sequential patterns")
@@ -33,53 +30,12 @@ def decode_differential_compression(raw_data, width=250, height=200):
     """Try differential/predictive compression"""
     print("🎯 Attempting differential compression decoding...")
     
-    output = bytearray(width * height)
-    
-    # Start with a default background (white)
-    for i in range(len(output)):
-        output[i] = 255  # White background
-    
     try:
-        # Try to interpret as run-length with differential encoding
-        ptr = 0
-        pixel_pos = 0
-        
-        while ptr < len(raw_data) and pixel_pos < len(output):
-            if ptr + 1 < len(raw_data):
-                cmd = raw_data[ptr]
-                param = raw_data[ptr + 1]
-                
-                if cmd == 0x00:  # Potential end marker
-                    break
-                elif cmd < 0x80:  # Potential run length
-                    # Copy literal run
-                    run_length = cmd
-                    if ptr + 1 + run_length <= len(raw_data):
-                        for j in range(run_length):
-                            if pixel_pos < len(output):
-                                output[pixel_pos] = raw_data[ptr + 1 + j]
-                                pixel_pos += 1
-                        ptr += 1 + run_length
-                        continue
-                else:  # Potential fill run
-                    run_length = 256 - cmd
-                    if ptr + 2 <= len(raw_data):
-                        fill_value = param
-                        for j in range(run_length):
-                            if pixel_pos < len(output):
-                                output[pixel_pos] = fill_value
-                                pixel_pos += 1
-                        ptr += 2
-                        continue
-            
-            # Default: copy single byte
-            if pixel_pos < len(output):
-                output[pixel_pos] = raw_data[ptr]
-                pixel_pos += 1
-            ptr += 1
-            
-        print(f"  Processed {pixel_pos} pixels")
-        return bytes(output)
+        # Header byte: 0x00 ends the data, below 0x80 copies that many bytes,
+        # otherwise repeats the next byte 256 - header times; white background
+        output = decode(raw_data, 'differential', limit=width * height)
+        print(f"  Processed {len(output)} pixels")
+        return output.tobytes() + b'\xff' * (width * height - len(output))
         
     except Exception as e:
         print(f"  ❌ Differential decoding failed: {e}")
@@ -101,25 +57,10 @@ def decode_bitpacked_compression(raw_data, width=250, height=200):
         total_bytes_needed = (total_pixels + pixels_per_byte - 1) // pixels_per_byte
         
         if len(raw_data) >= total_bytes_needed:
-            output = bytearray(total_pixels)
-            
             try:
-                for i in range(total_pixels):
-                    byte_idx = i // pixels_per_byte
-                    bit_offset = (i % pixels_per_byte) * bits_per_pixel
-                    
-                    if byte_idx < len(raw_data):
-                        # Extract bits
-                        byte_val = raw_data[byte_idx]
-                        pixel_val = (byte_val >> (8 - bit_offset - bits_per_pixel)) & ((1 << bits_per_pixel) - 1)
-                        
-                        # Scale to 8-bit
-                        output[i] = (pixel_val * 255) // ((1 << bits_per_pixel) - 1)
-                    else:
-                        output[i] = 255  # White
-                
+                output = unpack_pixels(raw_data, bits_per_pixel, width, height)
                 print(f"    ✅ {bits_per_pixel}-bit decoding completed")
-                return bytes(output)
+                return output.tobytes()
                 
             except Exception as e:
                 print(f"    ❌ {bits_per_pixel}-bit decoding failed: {e}")
@@ -130,34 +71,12 @@ def decode_custom_rle_variant(raw_data, width=250, height=200):
     """Try custom RLE variants that might match the data pattern"""
     print("🎯 Attempting custom RLE variant decoding...")
     
-    output = bytearray()
-    i = 0
-    
-    # Based on the hex pattern, try different interpretations
-    while i < len(raw_data) and len(output) < width * height:
-        if i + 2 < len(raw_data):
-            # Check for potential command pattern
-            b1, b2, b3 = raw_data[i], raw_data[i+1], raw_data[i+2]
-            
-            # Pattern 1: [count, value, something]
-            if b1 < 100 and b2 > 0:  # Reasonable values
-                output.extend([b2] * b1)
-                i += 3
-                continue
-            
-            # Pattern 2: [value, count, skip]
-            if b2 < 100 and b1 > 0:
-                output.extend([b1] * b2)
-                i += 3
-                continue
-        
-        # Default: copy single byte
-        output.append(raw_data[i])
-        i += 1
+    # [count, value, x] or [value, count, x] with counts below 100
+    output = decode(raw_data, 'triples', limit=width * height)
     
     if len(output) >= width * height:
         print(f"  ✅ Custom RLE produced {len(output)} bytes")
-        return bytes(output[:width * height])
+        return output.tobytes()
     else:
         print(f"  ❌ Custom RLE insufficient: {len(output)} bytes")
         return None
@@ -166,25 +85,17 @@ def decode_with_histogram_analysis(raw_data, width=250, height=200):
     """Use histogram analysis to guess the encoding"""
     print("🎯 Attempting histogram-based decoding...")
     
-    from collections import Counter
-    freq = Counter(raw_data)
+    stats = byte_stats(raw_data)
     
     # Find the most common "background" color
-    background = freq.most_common(1)[0][0] if freq else 255
+    background = stats.most_common(1)[0][0] if stats.size else 255
     
-    # Create output with background
-    output = bytearray([background] * (width * height))
-    
-    # Try to overlay the data as foreground
-    data_len = min(len(raw_data), len(output))
-    for i in range(data_len):
-        if raw_data[i] != background:  # Only overwrite if different
-            output[i] = raw_data[i]
-    
-    return bytes(output)
+    # Overlay the data as foreground on the background
+    size = width * height
+    return bytes(raw_data[:size]) + bytes([background]) * (size - min(len(raw_data), size))
 
-def brute_force_decoding(raw_data, width=250, height=200, base_filename="license_photo"):
-    """Try every conceivable decoding method"""
+def brute_force_decoding(raw_data, width=250, height=200, base_filename="license_photo", top=3, threshold=None, save=True):
+    """Try every conceivable decoding method, keeping the best scoring ones"""
     print("🔄 BRUTE FORCE DECODING ATTEMPT")
     print("=" * 50)
     
@@ -195,29 +106,14 @@ def brute_force_decoding(raw_data, width=250, height=200, base_filename="license
         ("Histogram", decode_with_histogram_analysis),
     ]
     
-    successful = []
-    
-    for name, decoder in methods:
-        try:
-            print(f"\nTrying {name}...")
-            result = decoder(raw_data, width, height)
-            if result and len(result) >= width * height:
-                filename = f"{base_filename}_{name.lower()}.png"
-                save_grayscale_image(result, width, height, filename)
-                successful.append((name, filename))
-                print(f"✅ {name} SUCCESS!")
-            else:
-                print(f"❌ {name} failed")
-        except Exception as e:
-            print(f"❌ {name} error: {e}")
-    
-    return successful
-
-def save_grayscale_image(data, width, height, filename):
-    """Save grayscale image"""
-    from PIL import Image
-    img = Image.frombytes('L', (width, height), bytes(data))
-    img.save(filename)
+    candidates = tournament.run(raw_data, width, height, methods, top=top, threshold=threshold)
+    for candidate in candidates:
+        stats = ', '.join(f"{key} {value:.3f}" for key, value in candidate.stats.items())
+        print(f"🏆 {candidate.name}: score {candidate.score:.3f} ({stats})")
+    
+    if save:
+        return tournament.save(candidates, base_filename)
+    return [(candidate.name, None) for candidate in candidates]
 
 def advanced_image_analysis(raw_data, width=250, height=200):
     """Comprehensive advanced analysis"""
@@ -241,15 +137,11 @@ def create_diagnostic_images(raw_data, width=250, height=200):
     print("\n📊 CREATING DIAGNOSTIC IMAGES")
     
     # Method 1: Direct mapping (truncated)
-    direct_data = raw_data + b'\xFF' * (width * height - len(raw_data))
-    direct_data = direct_data[:width * height]
-    save_grayscale_image(direct_data, width, height, "diagnostic_direct.png")
-    print("  💾 diagnostic_direct.png - Direct byte mapping")
+    results = [ImageResult.from_bytes("diagnostic_direct", raw_data, width, height, description="Direct byte mapping")]
     
     # Method 2: Repeated pattern
-    repeated_data = (raw_data * ( (width * height) // len(raw_data) + 1))[:width * height]
-    save_grayscale_image(repeated_data, width, height, "diagnostic_repeated.png")
-    print("  💾 diagnostic_repeated.png - Repeated pattern")
+    repeated_data = (bytes(raw_data) * ((width * height) // len(raw_data) + 1))[:width * height]
+    results.append(ImageResult.from_bytes("diagnostic_repeated", repeated_data, width, height, description="Repeated pattern"))
     
     # Method 3: Scaled (stretched)
     import numpy as np
@@ -257,13 +149,15 @@ def create_diagnostic_images(raw_data, width=250, height=200):
     # Create a small image from the data
     small_side = int((len(raw_data)) ** 0.5)
     if small_side > 0:
-        small_data = raw_data[:small_side * small_side]
-        small_data = small_data + b'\xFF' * (small_side * small_side - len(small_data))
-        small_img = Image.frombytes('L', (small_side, small_side), bytes(small_data))
+        small_img = ImageResult.from_bytes("small", raw_data, small_side, small_side).to_image()
         # Scale up
         scaled_img = small_img.resize((width, height), Image.NEAREST)
-        scaled_img.save("diagnostic_scaled.png")
-        print("  💾 diagnostic_scaled.png - Scaled from small image")
+        results.append(ImageResult("diagnostic_scaled", np.asarray(scaled_img), description="Scaled from small image"))
+    
+    for result in results:
+        filename = save(result)
+        print(f"  💾 {filename} - {result.metadata['description']}")
+    return results
 
 # Main execution function
 def decode_license_image(license_data):
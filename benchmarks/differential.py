@@ -0,0 +1,239 @@
+"""Differential equivalence harness for the decrypt/parse implementations
+
+Runs the reference sadl.decrypt_data/sadl.parse_data and alternative engines
+over a corpus and compares the decrypted bytes and every DrivingLicense field.
+For each engine it reports the first divergence with the byte offsets the
+reference read the field from, plus a count of divergences per field.
+
+    python benchmarks/differential.py                       # every engine
+    python benchmarks/differential.py -e fullcode -n 5000   # one engine, more payloads
+
+The corpus is the sample payloads in the repository (encrypted and
+unencrypted) plus seeded payloads from sadl.synth. Register new engines with
+@engine; an engine takes a list of (payload, encrypted) pairs and returns, for
+each, (decrypted bytes, {field: value}) or the exception it raised. The exit
+status is 1 if any selected engine diverged.
+"""
+import argparse
+import contextlib
+import json
+import os
+import shutil
+import subprocess
+import sys
+
+import fixtures
+import sadl
+from sadl.hexdump import layout
+
+ENGINES = {}
+
+
+def engine(name):
+    """Register a batch engine under name"""
+    def register(func):
+        ENGINES[name] = func
+        return func
+    return register
+
+
+def per_payload(func):
+    """Turn func(payload, encrypted) -> (decrypted, fields) into a batch engine"""
+    def run(batch):
+        results = []
+        for payload, encrypted in batch:
+            try:
+                results.append(func(payload, encrypted))
+            except Exception as err:
+                results.append(err)
+        return results
+    return run
+
+
+def _reference(payload, encrypted):
+    data = sadl.decrypt_data(payload) if encrypted else payload
+    return bytes(data), vars(sadl.parse_data(data))
+
+
+reference = per_payload(_reference)
+
+
+@engine('fullcode')
+@per_payload
+def _fullcode(payload, encrypted):
+    import fullcode
+
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        data = fullcode.decrypt_data(payload) if encrypted else payload
+        fields = vars(fullcode.parse_data(data))
+    return bytes(data), {key: value for key, value in fields.items() if key not in ('image_bytes', 'image_format')}
+
+
+@engine('decrypt_into')
+def _decrypt_into(batch):
+    # Decrypt every payload into a row of one preallocated arena, then parse the rows in place
+    arena = memoryview(bytearray(714 * len(batch)))
+    results = []
+    for i, (payload, encrypted) in enumerate(batch):
+        try:
+            data = sadl.decrypt_into(payload, arena[i * 714: (i + 1) * 714]) if encrypted else payload
+            results.append((bytes(data), vars(sadl.parse_data(data))))
+        except Exception as err:
+            results.append(err)
+    return results
+
+
+def _camel_case_image_size(fields):
+    fields = dict(fields)
+    fields['image_width'] = fields.pop('imageWidth', None)
+    fields['image_height'] = fields.pop('imageHeight', None)
+    fields.pop('status', None)
+    return fields
+
+
+@engine('looking')
+@per_payload
+def _looking(payload, encrypted):
+    import looking
+
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        data = looking.decrypt_data(payload) if encrypted else payload
+        fields = looking.parse_data(data)
+    return bytes(data), _camel_case_image_size(fields)
+
+
+_JS_RUNNER = r'''
+const fs = require('fs');
+const vm = require('vm');
+const context = {window: {addEventListener() {}}, console: {log() {}, error() {}}, BigInt, Uint8Array, Array, Number, String, Error};
+vm.createContext(context);
+vm.runInContext(fs.readFileSync(process.argv[1], 'utf8') + '\n;this.SALicenseDecoder = SALicenseDecoder;', context);
+const decoder = new context.SALicenseDecoder();
+const lines = fs.readFileSync(0, 'utf8').split('\n').filter(Boolean);
+for (const line of lines) {
+    const item = JSON.parse(line);
+    try {
+        const bytes = decoder.hexToBytes(item.hex);
+        let decrypted = bytes;
+        let fields;
+        if (item.encrypted) {
+            decrypted = decoder.decryptData(bytes);
+            fields = decoder.decodeLicense(item.hex);
+        } else {
+            fields = decoder.parseDataSimple(bytes);
+        }
+        process.stdout.write(JSON.stringify({decrypted: decoder.bytesToHex(decrypted), fields}) + '\n');
+    } catch (error) {
+        process.stdout.write(JSON.stringify({error: String(error)}) + '\n');
+    }
+}
+'''
+
+
+@engine('js')
+def _js(batch):
+    node = shutil.which('node')
+    if node is None:
+        return [RuntimeError('node is not installed')] * len(batch)
+    lines = ''.join(json.dumps({'hex': payload.hex(), 'encrypted': encrypted}) + '\n' for payload, encrypted in batch)
+    output = subprocess.run([node, '-e', _JS_RUNNER, str(fixtures.ROOT / 'license-decoder.js')],
+                            input=lines, capture_output=True, text=True, check=True).stdout
+    results = []
+    for line in output.splitlines():
+        item = json.loads(line)
+        if 'error' in item:
+            results.append(RuntimeError(item['error']))
+        else:
+            results.append((bytes.fromhex(item['decrypted']), _camel_case_image_size(item['fields'])))
+    return results
+
+
+def first_difference(expected, actual):
+    """Offset of the first differing byte, or None if equal"""
+    for i, (a, b) in enumerate(zip(expected, actual)):
+        if a != b:
+            return i
+    if len(expected) != len(actual):
+        return min(len(expected), len(actual))
+    return None
+
+
+def compare(expected, actual):
+    """First divergence between a reference and an engine result
+
+    Returns:
+        (field, description) or None. field is 'decrypted' for decrypted
+        bytes, 'error' when either side raised, or a DrivingLicense field.
+    """
+    if isinstance(expected, Exception) or isinstance(actual, Exception):
+        if isinstance(expected, Exception) and isinstance(actual, Exception):
+            return None
+        return 'error', f'reference: {expected!r}, engine: {actual!r}'
+
+    expected_data, expected_fields = expected
+    actual_data, actual_fields = actual
+    offset = first_difference(expected_data, actual_data)
+    if offset is not None:
+        return 'decrypted', (f'decrypted bytes differ at offset {offset}: '
+                             f'reference {expected_data[offset: offset + 8].hex()} ({len(expected_data)} bytes), '
+                             f'engine {actual_data[offset: offset + 8].hex()} ({len(actual_data)} bytes)')
+
+    for field, value in expected_fields.items():
+        other = actual_fields.get(field, '<missing>')
+        if other != value:
+            try:
+                start, end = layout(expected_data)[field]
+                where = f'bytes {start}..{end} ({expected_data[start:end].hex()})'
+            except (KeyError, ValueError, IndexError):
+                where = 'offsets unknown'
+            return field, f'{field} at {where}: reference {value!r}, engine {other!r}'
+    return None
+
+
+def corpus(count, seed):
+    """(name, payload, encrypted) for the repository samples and count synthetic payloads"""
+    from sadl.synth import generate
+
+    items = [('images/dl.raw', fixtures.raw_payload(), False)]
+    items += [(f'encrypted sample {i}', payload, True) for i, payload in enumerate(fixtures.encrypted_samples())]
+    items += [(f'synth seed {seed} #{i}', payload, False) for i, payload in enumerate(generate(count, seed))]
+    return items
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare decrypt/parse engines against the reference implementation.')
+    parser.add_argument('-e', '--engine', action='append', choices=sorted(ENGINES), help='Engines to check (repeatable, default: all)')
+    parser.add_argument('-n', '--count', default=500, type=int, help='Number of synthetic payloads')
+    parser.add_argument('-s', '--seed', default=0, type=int, help='Seed for the synthetic payloads')
+    args = parser.parse_args()
+
+    items = corpus(args.count, args.seed)
+    batch = [(payload, encrypted) for name, payload, encrypted in items]
+    expected = reference(batch)
+
+    diverged = False
+    for name in args.engine or list(ENGINES):
+        results = ENGINES[name](batch)
+        fields = {}
+        first = None
+        for item, want, got in zip(items, expected, results):
+            divergence = compare(want, got)
+            if divergence is not None:
+                fields[divergence[0]] = fields.get(divergence[0], 0) + 1
+                if first is None:
+                    first = (item[0], divergence[1])
+
+        if first is None:
+            print(f'{name}: {len(items)} payloads identical')
+            continue
+        diverged = True
+        print(f'{name}: {sum(fields.values())} of {len(items)} payloads diverge')
+        print(f'  first: {first[0]}: {first[1]}')
+        for field, count in sorted(fields.items(), key=lambda item: -item[1]):
+            print(f'  {field:24s} {count}')
+
+    sys.exit(1 if diverged else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+"""Sample payloads shipped with the repository, shared by the benchmarks"""
+import re
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+
+def raw_payload():
+    """Decrypted license data from images/dl.raw"""
+    return (ROOT / 'images' / 'dl.raw').read_bytes()
+
+
+def base64_payload():
+    """Base64 text of decrypted license data from images/dlbase64.txt"""
+    return (ROOT / 'images' / 'dlbase64.txt').read_text()
+
+
+def encrypted_payload():
+    """Encrypted 720-byte (version 2) payload used by the example scripts"""
+    source = (ROOT / 'nokey.py').read_text()
+    return bytes.fromhex(re.search(r'hex_data = "(\w+)"', source).group(1))
+
+
+def encrypted_samples():
+    """Every distinct encrypted 720-byte payload embedded in the repository's scripts"""
+    samples = []
+    for name in ('nokey.py', 'withkey.py', 'fullcode.py', 'license-decoder.js', 'index.html'):
+        for match in re.findall(r'(?:019B0945|01E10245)[0-9A-Fa-f]{1432}', (ROOT / name).read_text()):
+            data = bytes.fromhex(match)
+            if data not in samples:
+                samples.append(data)
+    return samples
+
+
+def string_section(data):
+    """Offset of the first string after the 0x82 section marker"""
+    return data.index(0x82) + 2
+
+
+def nibble_section(data):
+    """Nibble-packed dates section, located with sadl.field_offsets"""
+    import sadl
+
+    start, end = sadl.field_offsets(data)['binary']
+    return data[start + 1: end]
@@ -0,0 +1,92 @@
+"""Golden check for sadl.photo: decoded sample photos must not change silently
+
+    python benchmarks/golden.py             # check every case against GOLDEN
+    python benchmarks/golden.py --record    # print results in GOLDEN format
+
+Only embedded images are checked: the sample payload with its image data
+replaced by a JPEG, PNG or BMP, which sadl.photo decodes with Pillow. Each
+case compares the detected format, the decoder and a SHA-256 of the pixels;
+re-record when a change is intended and say why in the commit message. The
+exit status is 1 if any case differs.
+
+The raw 'WI' photos of the shipped samples have no known format: decode()
+returns whichever tournament decoder scores best, which is a guess, not a
+decoded photo. They are printed as experimental and never fail the check.
+"""
+import argparse
+import hashlib
+import io
+import sys
+
+import numpy as np
+
+import fixtures
+import sadl
+from sadl.image import image_section
+from sadl.photo import decode_photo
+
+GOLDEN = {
+    'embedded_jpeg': {'format': 'jpeg', 'method': 'pillow', 'sha256': 'cc3b2e2a910f1e877c8ce8645194ec6a6b8b9164f445de9dfa7eb33ba44b166f'},
+    'embedded_png': {'format': 'png', 'method': 'pillow', 'sha256': 'c77d39480652834691fb09481ee63e8d56a8f16caebf1b795bb9b81eec06ecff'},
+    'embedded_bmp': {'format': 'bmp', 'method': 'pillow', 'sha256': 'c77d39480652834691fb09481ee63e8d56a8f16caebf1b795bb9b81eec06ecff'},
+}
+
+def _embedded(image_format):
+    # The sample payload with a gradient image in place of its image data
+    from PIL import Image
+
+    data = fixtures.raw_payload()
+    offset, width, height = image_section(data)
+    image = io.BytesIO()
+    Image.fromarray(np.add.outer(np.arange(height), np.arange(width)).astype(np.uint8)).save(image, image_format)
+    return data[:offset] + image.getvalue()
+
+
+def cases():
+    """(name, decrypted data) of the checked cases"""
+    for image_format in ('JPEG', 'PNG', 'BMP'):
+        yield f'embedded_{image_format.lower()}', _embedded(image_format)
+
+
+def experimental():
+    """(name, decrypted data) of the shipped samples, whose raw photos are only guessed"""
+    yield 'raw_payload', fixtures.raw_payload()
+    for i, payload in enumerate(fixtures.encrypted_samples()):
+        yield f'encrypted_sample_{i}', sadl.decrypt_data(payload)
+
+
+def _result(data):
+    photo = decode_photo(data)
+    return {'format': photo.metadata['format'], 'method': photo.metadata['method'], 'sha256': hashlib.sha256(photo.pixels.tobytes()).hexdigest()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check decoded sample photos against recorded digests.')
+    parser.add_argument('--record', action='store_true', help='Print the results as GOLDEN entries instead of checking them')
+    args = parser.parse_args()
+
+    failed = []
+    for name, data in cases():
+        result = _result(data)
+        if args.record:
+            print(f'    {name!r}: {result!r},')
+            continue
+        expected = GOLDEN.get(name)
+        line = f'{name:24s}  {result["format"]:5s} {result["method"]:16s} {result["sha256"][:16]}'
+        if result != expected:
+            line += f'  DIFFERS (expected {expected})'
+            failed.append(name)
+        print(line, flush=True)
+
+    if not args.record:
+        for name, data in experimental():
+            result = _result(data)
+            print(f'{name:24s}  {result["format"]:5s} {result["method"]:16s} {result["sha256"][:16]}  experimental, not checked', flush=True)
+
+    if failed:
+        print(f'FAIL: changed: {", ".join(failed)}')
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
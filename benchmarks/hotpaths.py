@@ -0,0 +1,224 @@
+"""Microbenchmarks and throughput benchmarks for the decode/decrypt/parse hot paths
+
+Every benchmark is a setup function that prepares its inputs and returns
+(callable, items processed per call). Register new ones with @benchmark.
+"""
+import fixtures
+import sadl
+
+BENCHMARKS = {}
+
+
+def benchmark(slow=False):
+    """Register a benchmark setup function; slow ones only run with --slow"""
+    def register(setup):
+        BENCHMARKS[setup.__name__] = (setup, slow)
+        return setup
+    return register
+
+
+@benchmark()
+def decrypt_data():
+    data = fixtures.encrypted_payload()
+    return (lambda: sadl.decrypt_data(data)), 1
+
+
+@benchmark()
+def decrypt_into():
+    data = fixtures.encrypted_payload()
+    out = bytearray(714)
+    return (lambda: sadl.decrypt_into(data, out)), 1
+
+
+@benchmark()
+def parse_data():
+    data = fixtures.raw_payload()
+    return (lambda: sadl.parse_data(data)), 1
+
+
+@benchmark()
+def read_strings():
+    data = fixtures.raw_payload()
+    index = fixtures.string_section(data)
+    return (lambda: sadl.readStrings(data, index, 4)), 1
+
+
+@benchmark()
+def read_string():
+    data = fixtures.raw_payload()
+    strings, index = sadl.readStrings(data, fixtures.string_section(data), 4)
+    return (lambda: sadl.readString(data, index)), 1
+
+
+def _nibbles():
+    nibbles = []
+    for byte in fixtures.nibble_section(fixtures.raw_payload()):
+        nibbles += [byte >> 4, byte & 0x0f]
+    return nibbles
+
+
+@benchmark()
+def read_nibble_date_string():
+    nibbles = _nibbles()
+    return (lambda: sadl.readNibbleDateString(list(nibbles))), 1
+
+
+@benchmark()
+def read_nibble_date_list():
+    nibbles = _nibbles()
+    return (lambda: sadl.readNibbleDateList(list(nibbles), 4)), 1
+
+
+@benchmark()
+def parse_base64():
+    text = fixtures.base64_payload()
+    return (lambda: sadl.parse_base64(text)), 1
+
+
+@benchmark()
+def parse_bytes():
+    data = fixtures.raw_payload()
+    return (lambda: sadl.parse_bytes(data)), 1
+
+
+@benchmark()
+def parse_bytes_encrypted():
+    data = fixtures.encrypted_payload()
+    return (lambda: sadl.parse_bytes(data, True)), 1
+
+
+def _packed_image(bits):
+    # The sample payload repeated up to a 250x200 image at the given depth
+    data = fixtures.raw_payload()
+    size = 250 * 200 * bits // 8
+    return (data * (size // len(data) + 1))[:size]
+
+
+@benchmark()
+def unpack_pixels_1bit():
+    from sadl.pixels import unpack_pixels
+
+    data = _packed_image(1)
+    return (lambda: unpack_pixels(data, 1, 250, 200)), 1
+
+
+@benchmark()
+def unpack_pixels_4bit():
+    from sadl.pixels import unpack_pixels
+
+    data = _packed_image(4)
+    return (lambda: unpack_pixels(data, 4, 250, 200)), 1
+
+
+@benchmark()
+def rle_decode():
+    from sadl.image import find_image
+    from sadl.rle import decode
+
+    image, image_format = find_image(fixtures.raw_payload())
+    return (lambda: decode(image, 'differential', limit=250 * 200)), 1
+
+
+@benchmark()
+def byte_stats():
+    # Uncached: a new ByteStats per call
+    from sadl.bytestats import ByteStats
+    from sadl.image import find_image
+
+    image, image_format = find_image(fixtures.raw_payload())
+    return (lambda: ByteStats(image)), 1
+
+
+@benchmark()
+def classify():
+    from sadl.classify import classify
+    from sadl.image import find_image
+
+    image, image_format = find_image(fixtures.raw_payload())
+    return (lambda: classify(image)), 1
+
+
+@benchmark()
+def plot_points():
+    # 5x5 squares at [x, y] pairs, as in the biometric template visualization
+    import numpy as np
+
+    from sadl.image import find_image
+    from sadl.pixels import plot
+
+    image, image_format = find_image(fixtures.raw_payload())
+    data = np.frombuffer(image, dtype=np.uint8)
+
+    def run():
+        plot(np.full((200, 250), 255, dtype=np.uint8), data[0:-1:2], data[1::2], 0, radius=2)
+    return run, 1
+
+
+@benchmark()
+def tournament_run():
+    from sadl import tournament
+    from sadl.image import find_image
+
+    image, image_format = find_image(fixtures.raw_payload())
+    return (lambda: tournament.run(image, 250, 200)), 1
+
+
+@benchmark()
+def photo_decode():
+    from sadl.photo import decode_photo
+
+    data = fixtures.raw_payload()
+    return (lambda: decode_photo(data)), 1
+
+
+def _throughput(size, encrypted):
+    data = fixtures.encrypted_payload() if encrypted else fixtures.raw_payload()
+    batch = [data] * size
+
+    def run():
+        for payload in batch:
+            sadl.parse_bytes(payload, encrypted)
+    return run, size
+
+
+@benchmark()
+def throughput_1():
+    return _throughput(1, False)
+
+
+@benchmark()
+def throughput_1k():
+    return _throughput(1000, False)
+
+
+@benchmark()
+def throughput_100k():
+    return _throughput(100000, False)
+
+
+@benchmark()
+def throughput_synthetic_100k():
+    # 100k distinct records instead of one payload repeated
+    from sadl.synth import generate
+
+    batch = list(generate(100000, seed=1))
+
+    def run():
+        for payload in batch:
+            sadl.parse_bytes(payload)
+    return run, len(batch)
+
+
+@benchmark()
+def throughput_encrypted_1():
+    return _throughput(1, True)
+
+
+@benchmark()
+def throughput_encrypted_1k():
+    return _throughput(1000, True)
+
+
+@benchmark(slow=True)
+def throughput_encrypted_100k():
+    return _throughput(100000, True)
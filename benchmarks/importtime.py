@@ -0,0 +1,64 @@
+"""Import-time budget check for the sadl package
+
+Runs `python -X importtime` in a fresh interpreter, parses a sample payload
+without decryption and fails if the cumulative import time of sadl exceeds the
+budget or if any heavy optional dependency got loaded along the way.
+
+    python benchmarks/importtime.py --budget-ms 50
+"""
+import argparse
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+HEAVY_MODULES = ('dbr', 'rsa', 'PIL', 'numpy', 'cv2')
+
+SNIPPET = '''
+import sys
+import sadl
+sadl.parse_base64(open({sample!r}).read())
+sadl.parse_bytes(open({raw!r}, 'rb').read())
+print(','.join(sorted(name for name in {heavy!r} if name in sys.modules)))
+'''
+
+
+def measure():
+    """Return (cumulative sadl import time in ms, heavy modules loaded)"""
+    code = SNIPPET.format(sample=str(ROOT / 'images' / 'dlbase64.txt'), raw=str(ROOT / 'images' / 'dl.raw'), heavy=HEAVY_MODULES)
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], cwd=ROOT, capture_output=True, text=True, check=True)
+
+    cumulative = None
+    for line in result.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        parts = line.split('|')
+        if len(parts) == 3 and parts[2].strip() == 'sadl':
+            cumulative = int(parts[1]) / 1000
+    loaded = [name for name in result.stdout.strip().split(',') if name]
+    return cumulative, loaded
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check the import-time budget of sadl.')
+    parser.add_argument('--budget-ms', default=50.0, type=float, help='Maximum cumulative import time of sadl in milliseconds')
+    args = parser.parse_args()
+
+    cumulative, loaded = measure()
+    failed = False
+    if cumulative is None:
+        print('FAIL: no -X importtime line for sadl')
+        failed = True
+    else:
+        print(f'sadl import: {cumulative:.1f} ms (budget {args.budget_ms:.1f} ms)')
+        if cumulative > args.budget_ms:
+            print('FAIL: import time over budget')
+            failed = True
+    if loaded:
+        print(f'FAIL: parsing unencrypted payloads loaded {", ".join(loaded)}')
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
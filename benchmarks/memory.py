@@ -0,0 +1,145 @@
+"""Memory budget checks: peak and retained bytes per parsed license
+
+    python benchmarks/memory.py                 # check every scenario against BUDGETS
+    python benchmarks/memory.py --record        # print measurements in BUDGETS format
+
+Workers are memory-capped, so allocations on the hot paths matter as much as
+speed. Each scenario runs under tracemalloc and reports:
+
+    single    peak traced memory of parsing one license, i.e. the transient
+              working set that bytearray growth or per-byte lists inflate
+    peak      peak traced memory of the whole batch, per license
+    retained  memory still allocated after the batch while the results are
+              kept, per license
+
+All values are bytes above what was allocated before the run started.
+
+Only allocations of this process are traced: the worker processes of
+parse_batch are not included, but the slot bookkeeping around them is.
+The exit status is 1 if any scenario exceeds its budget.
+"""
+import argparse
+import contextlib
+import gc
+import os
+import sys
+import tracemalloc
+
+import fixtures
+import sadl
+
+# Bytes (per license for peak and retained), recorded with --record plus ~10%
+# headroom. tracemalloc counts are deterministic for a given Python version, so
+# the headroom only has to absorb interpreter differences. Lower a budget when
+# an optimization lands; raising one needs a reason in the commit message.
+BUDGETS = {
+    'parse_bytes': {'single': 6700, 'peak': 1550, 'retained': 1310},
+    'parse_bytes_encrypted': {'single': 28400, 'peak': 2000, 'retained': 1500},
+    'parse_base64': {'single': 9000, 'peak': 1550, 'retained': 1310},
+    'fullcode_parse_bytes': {'single': 10400, 'peak': 1720, 'retained': 1690},
+    'batch_plain_10k': {'single': 6800, 'peak': 1360, 'retained': 1310},
+    'batch_shm_200': {'single': 52800, 'peak': 2000, 'retained': 1500},
+}
+
+SCENARIOS = {}
+
+
+def scenario(count):
+    """Register a function parsing count licenses and returning the results"""
+    def register(func):
+        SCENARIOS[func.__name__] = (func, count)
+        return func
+    return register
+
+
+@scenario(200)
+def parse_bytes(count):
+    data = fixtures.raw_payload()
+    return [sadl.parse_bytes(data) for _ in range(count)]
+
+
+@scenario(20)
+def parse_bytes_encrypted(count):
+    data = fixtures.encrypted_payload()
+    return [sadl.parse_bytes(data, True) for _ in range(count)]
+
+
+@scenario(200)
+def parse_base64(count):
+    text = fixtures.base64_payload()
+    return [sadl.parse_base64(text) for _ in range(count)]
+
+
+@scenario(200)
+def fullcode_parse_bytes(count):
+    # fullcode.parse_data also slices out the image section
+    import fullcode
+
+    data = fixtures.raw_payload()
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        return [fullcode.parse_bytes(data) for _ in range(count)]
+
+
+@scenario(10000)
+def batch_plain_10k(count):
+    return [sadl.parse_bytes(data) for data in [fixtures.raw_payload()] * count]
+
+
+@scenario(200)
+def batch_shm_200(count):
+    from sadl.shm import parse_batch
+
+    return parse_batch([fixtures.encrypted_payload()] * count, workers=2)
+
+
+def _traced(func, count):
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        results = func(count)
+        gc.collect()
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert len(results) == count and all(dl is not None for dl in results)
+    return peak - before, current - before
+
+
+def measure(func, count):
+    """Return {'single', 'peak', 'retained'} in bytes"""
+    # Warm up caches (keys, imports, fixtures) so they are not charged to the run
+    func(1)
+    single, _ = _traced(func, 1)
+    peak, retained = _traced(func, count)
+    return {'single': single, 'peak': peak // count, 'retained': retained // count}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check peak and retained memory per parsed license.')
+    parser.add_argument('-f', '--filter', default='', help='Only run scenarios whose name contains this string')
+    parser.add_argument('--record', action='store_true', help='Print the measurements as BUDGETS entries instead of checking them')
+    args = parser.parse_args()
+
+    failed = []
+    for name, (func, count) in SCENARIOS.items():
+        if args.filter not in name:
+            continue
+        usage = measure(func, count)
+        if args.record:
+            print(f'    {name!r}: {usage!r},')
+            continue
+        budget = BUDGETS[name]
+        line = f'{name:24s}' + ''.join(f'  {key} {usage[key]:6d}/{budget[key]}' for key in budget)
+        if any(usage[key] > budget[key] for key in budget):
+            line += '  OVER BUDGET'
+            failed.append(name)
+        print(line, flush=True)
+
+    if failed:
+        print(f'FAIL: over budget: {", ".join(failed)}')
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
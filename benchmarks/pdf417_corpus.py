@@ -0,0 +1,206 @@
+"""Synthetic PDF417 image corpus for decoder benchmarks
+
+Renders 720-byte payloads into PDF417 barcodes with pdf417gen (a pure-Python
+encoder) and applies controlled variations with Pillow. Everything is seeded,
+so the same arguments produce the same corpus.
+
+    python benchmarks/pdf417_corpus.py generate -o corpus -n 20
+    python benchmarks/pdf417_corpus.py measure corpus -l <license key>
+
+generate writes the images plus corpus/manifest.jsonl, one line per image with
+the variation, its parameters and the expected payload in hex. measure runs
+sadl.decode_pdf417 over the manifest and reports the success rate and
+throughput per variation. "found" counts images where any barcode was read,
+"exact" those that returned the expected payload; an unlicensed SDK masks
+part of the bytes, so only "found" is meaningful without a valid key.
+
+Requires: pip install pdf417gen pillow numpy
+"""
+import argparse
+import json
+import random
+import time
+from collections import defaultdict
+from pathlib import Path
+
+import numpy as np
+
+import fixtures
+
+# Header of version 2 encrypted payloads: magic plus two zero bytes
+V2_HEADER = bytes([0x01, 0x9b, 0x09, 0x45, 0x00, 0x00])
+
+DEFAULTS = {
+    'scale': 2,        # pixels per module
+    'rotate': 0.0,     # degrees, counter-clockwise
+    'blur': 0.0,       # Gaussian blur radius in pixels
+    'noise': 0.0,      # standard deviation of additive Gaussian noise
+    'jpeg': None,      # JPEG quality, or None for PNG
+    'card': False,     # place the barcode on a card-like canvas
+}
+
+VARIATIONS = {
+    'clean': {},
+    'scale_1': {'scale': 1},
+    'scale_4': {'scale': 4},
+    'rotate_2': {'rotate': 2.0},
+    'rotate_10': {'rotate': 10.0},
+    'rotate_90': {'rotate': 90.0},
+    'blur_1': {'blur': 1.0},
+    'blur_2': {'blur': 2.0},
+    'noise_15': {'noise': 15.0},
+    'noise_40': {'noise': 40.0},
+    'jpeg_75': {'jpeg': 75},
+    'jpeg_30': {'jpeg': 30},
+    'card': {'card': True},
+    'card_phone': {'card': True, 'rotate': 4.0, 'blur': 1.0, 'noise': 10.0, 'jpeg': 60},
+}
+
+# Card canvas similar to the back of a license, at roughly 300 dpi
+CARD_SIZE = (1012, 638)
+
+
+def payloads(count, seed):
+    """The shipped encrypted sample followed by seeded random 720-byte payloads"""
+    rng = random.Random(seed)
+    yield fixtures.encrypted_payload()
+    for _ in range(count - 1):
+        yield V2_HEADER + rng.randbytes(720 - len(V2_HEADER))
+
+
+def encode(payload, columns=17, security_level=5):
+    """PDF417 code rows for a payload, with pdf417gen.encode() when it fits
+
+    pdf417gen.encode() switches modes on every printable run, which inflates
+    binary data past the 928 code word limit; as of pdf417gen 0.8.1 it has no
+    option to force byte compaction and rejects even the shipped sample.
+    Those payloads fall back to encode_bytes().
+    """
+    import pdf417gen
+
+    try:
+        return pdf417gen.encode(payload, columns=columns, security_level=security_level)
+    except ValueError:
+        return encode_bytes(payload, columns, security_level)
+
+
+def encode_bytes(payload, columns=17, security_level=5):
+    """PDF417 code rows for binary data using byte compaction only
+
+    Follows pdf417gen's encode_high() with a single byte compaction latch.
+    The helpers it needs are not exported by the package.
+    """
+    from pdf417gen.compaction import BYTE_LATCH, BYTE_LATCH_ALT
+    from pdf417gen.compaction.byte import compact_bytes
+    from pdf417gen.encoding import encode_rows, get_padding, validate_barcode_size
+    from pdf417gen.error_correction import compute_error_correction_code_words
+
+    latch = BYTE_LATCH_ALT if len(payload) % 6 == 0 else BYTE_LATCH
+    data_words = [latch] + list(compact_bytes(payload))
+    padding = get_padding(len(data_words), 2 ** (security_level + 1), columns)
+    words = [len(data_words) + len(padding) + 1] + data_words + padding
+    validate_barcode_size(words[0], -(-(len(words) + 2 ** (security_level + 1)) // columns))
+    words += compute_error_correction_code_words(words, security_level)
+    rows = [words[i: i + columns] for i in range(0, len(words), columns)]
+    return list(encode_rows(rows, columns, security_level))
+
+
+def render(payload, params, rng):
+    """Render a payload as a PDF417 image with the given variation parameters
+
+    Returns:
+        PIL.Image.Image: grayscale image
+    """
+    import pdf417gen
+    from PIL import Image, ImageDraw, ImageFilter
+
+    codes = encode(payload)
+    image = pdf417gen.render_image(codes, scale=params['scale'], ratio=3, padding=5 * params['scale']).convert('L')
+
+    if params['card']:
+        canvas = Image.new('L', CARD_SIZE, 235)
+        draw = ImageDraw.Draw(canvas)
+        # Printed lines standing in for text above the barcode
+        for y in range(40, CARD_SIZE[1] // 3, 24):
+            draw.rectangle((40, y, 40 + rng.randrange(200, CARD_SIZE[0] - 80), y + 10), fill=rng.randrange(60, 160))
+        if image.width > CARD_SIZE[0] - 40 or image.height > CARD_SIZE[1] * 2 // 3 - 20:
+            image.thumbnail((CARD_SIZE[0] - 40, CARD_SIZE[1] * 2 // 3 - 20))
+        x = rng.randrange(20, CARD_SIZE[0] - image.width - 19)
+        y = rng.randrange(CARD_SIZE[1] // 3, CARD_SIZE[1] - image.height - 19)
+        canvas.paste(image, (x, y))
+        image = canvas
+
+    if params['rotate']:
+        image = image.rotate(params['rotate'], resample=Image.BICUBIC, expand=True, fillcolor=255)
+    if params['blur']:
+        image = image.filter(ImageFilter.GaussianBlur(params['blur']))
+    if params['noise']:
+        noise = np.random.default_rng(rng.getrandbits(64)).normal(0, params['noise'], (image.height, image.width))
+        image = Image.fromarray(np.clip(np.asarray(image) + noise, 0, 255).astype(np.uint8))
+    return image
+
+
+def generate(output, count, seed, names):
+    output = Path(output)
+    (output / 'images').mkdir(parents=True, exist_ok=True)
+    samples = list(payloads(count, seed))
+    with open(output / 'manifest.jsonl', 'w') as manifest:
+        for name in names:
+            params = dict(DEFAULTS, **VARIATIONS[name])
+            rng = random.Random(f'{seed}:{name}')
+            for index, payload in enumerate(samples):
+                image = render(payload, params, rng)
+                if params['jpeg'] is None:
+                    filename = f'images/{name}_{index:04d}.png'
+                    image.save(output / filename)
+                else:
+                    filename = f'images/{name}_{index:04d}.jpg'
+                    image.save(output / filename, quality=params['jpeg'])
+                record = {'file': filename, 'variation': name, 'params': params, 'payload': payload.hex()}
+                manifest.write(json.dumps(record) + '\n')
+            print(f'{name:12s} {len(samples)} images', flush=True)
+
+
+def measure(corpus, license):
+    from sadl import decode_pdf417
+
+    corpus = Path(corpus)
+    totals = defaultdict(lambda: [0, 0, 0, 0.0])
+    with open(corpus / 'manifest.jsonl') as manifest:
+        for line in manifest:
+            record = json.loads(line)
+            start = time.perf_counter()
+            data = decode_pdf417(str(corpus / record['file']), license)
+            elapsed = time.perf_counter() - start
+            total = totals[record['variation']]
+            total[0] += 1
+            total[1] += data is not None
+            total[2] += data is not None and bytes(data).hex() == record['payload']
+            total[3] += elapsed
+
+    print(f'{"variation":12s} {"images":>7s} {"found":>7s} {"exact":>7s} {"ms/image":>9s}')
+    for name, (images, found, exact, seconds) in totals.items():
+        print(f'{name:12s} {images:7d} {found / images:7.1%} {exact / images:7.1%} {seconds / images * 1000:9.1f}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate or measure a synthetic PDF417 image corpus.')
+    commands = parser.add_subparsers(dest='command', required=True)
+    gen = commands.add_parser('generate', help='Render payloads into barcode images')
+    gen.add_argument('-o', '--output', default='corpus', help='Output directory')
+    gen.add_argument('-n', '--count', default=10, type=int, help='Payloads per variation')
+    gen.add_argument('-s', '--seed', default=0, type=int, help='Random seed')
+    gen.add_argument('-v', '--variation', action='append', choices=sorted(VARIATIONS), help='Only render these variations (repeatable)')
+    run = commands.add_parser('measure', help='Decode a corpus and report success rate per variation')
+    run.add_argument('corpus', help='Directory written by generate')
+    run.add_argument('-l', '--license', default='', help='Dynamsoft Barcode Reader license key')
+    args = parser.parse_args()
+
+    if args.command == 'generate':
+        generate(args.output, args.count, args.seed, args.variation or list(VARIATIONS))
+    else:
+        measure(args.corpus, args.license)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+"""Run the hot path benchmarks and compare them with a stored baseline
+
+    python benchmarks/run.py                          # run everything except slow benchmarks
+    python benchmarks/run.py --filter parse --slow    # select by substring, include slow ones
+    python benchmarks/run.py --save baseline.json     # store a baseline
+    python benchmarks/run.py --compare baseline.json --threshold 0.10
+
+Each benchmark is repeated and the fastest repeat is reported, which is the
+least noisy estimate on a busy machine. With --compare the exit status is 1
+if any benchmark got slower than the baseline by more than the threshold.
+"""
+import argparse
+import json
+import sys
+import time
+
+from hotpaths import BENCHMARKS
+
+
+def calibrate(func, target):
+    """Number of loops for one repeat to take roughly target seconds"""
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= target or loops >= 1 << 20:
+            return loops
+        loops = max(loops * 2, int(loops * target / max(elapsed, 1e-9)))
+
+
+def measure(func, repeat, target):
+    """Fastest time per call in seconds"""
+    loops = calibrate(func, target)
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(loops):
+            func()
+        best = min(best, (time.perf_counter() - start) / loops)
+    return best
+
+
+def _format_time(seconds):
+    for unit, scale in (('s', 1), ('ms', 1e-3), ('us', 1e-6)):
+        if seconds >= scale:
+            return f'{seconds / scale:.2f} {unit}'
+    return f'{seconds / 1e-9:.0f} ns'
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the decode/decrypt/parse hot paths.')
+    parser.add_argument('-f', '--filter', default='', help='Only run benchmarks whose name contains this string')
+    parser.add_argument('--slow', action='store_true', help='Include slow benchmarks')
+    parser.add_argument('-r', '--repeat', default=5, type=int, help='Number of repeats per benchmark')
+    parser.add_argument('--target', default=0.2, type=float, help='Approximate duration of one repeat in seconds')
+    parser.add_argument('--save', metavar='FILE', help='Write the results as a JSON baseline')
+    parser.add_argument('--compare', metavar='FILE', help='Compare with a JSON baseline and fail on regressions')
+    parser.add_argument('--threshold', default=0.10, type=float, help='Allowed slowdown over the baseline, 0.10 = 10%%')
+    args = parser.parse_args()
+
+    baseline = {}
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+
+    results = {}
+    regressions = []
+    for name, (setup, slow) in BENCHMARKS.items():
+        if args.filter not in name or (slow and not args.slow):
+            continue
+        func, items = setup()
+        seconds = measure(func, args.repeat, args.target)
+        results[name] = seconds
+        line = f'{name:28s} {_format_time(seconds):>10s}/call {items / seconds:14,.0f} items/s'
+        if name in baseline:
+            change = seconds / baseline[name] - 1
+            line += f' {change:+7.1%}'
+            if change > args.threshold:
+                line += '  REGRESSION'
+                regressions.append(name)
+        print(line, flush=True)
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+    if regressions:
+        print(f'FAIL: {len(regressions)} benchmark(s) slower than the baseline by more than {args.threshold:.0%}: {", ".join(regressions)}')
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,39 @@
+"""Compare shared-memory payload transport against plain pickling
+
+    python benchmarks/shm_transport.py --count 2000 --workers 4
+"""
+import argparse
+import multiprocessing
+import time
+
+from fixtures import encrypted_payload
+from sadl import decrypt_data, parse_data
+from sadl.shm import parse_batch
+
+
+def pickled_batch(payloads, workers):
+    with multiprocessing.Pool(workers) as pool:
+        return [parse_data(data) for data in pool.imap(decrypt_data, payloads, chunksize=1)]
+
+
+def shared_batch(payloads, workers):
+    return parse_batch(payloads, workers=workers)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark payload transport for parallel decryption.')
+    parser.add_argument('--count', default=2000, type=int, help='Number of payloads')
+    parser.add_argument('--workers', default=4, type=int, help='Number of worker processes')
+    args = parser.parse_args()
+
+    payloads = [encrypted_payload()] * args.count
+    for name, run in (('pickle', pickled_batch), ('shared memory', shared_batch)):
+        start = time.perf_counter()
+        results = run(payloads, args.workers)
+        elapsed = time.perf_counter() - start
+        assert len(results) == args.count and all(dl is not None for dl in results)
+        print(f'{name:>14}: {elapsed:.3f}s  {args.count / elapsed:,.0f} payloads/s')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,10 +1,9 @@
 # https://github.com/ugommirikwe/sa-license-decoder/blob/master/SPEC.md
-from PIL import Image
-import numpy as np
 import base64
-import rsa
 from pathlib import Path
-from dbr import *
+
+from sadl.hexdump import dump, layout
+from sadl.image import extract_image, image_section, sniff_format
 
 __version__ = '0.1.1'
 
@@ -38,6 +37,8 @@ MF8CSwC0BKDfEdHKz/GhoEjU1XP5U6YsWD10klknVhpteh4rFAQlJq9wtVBUc5DqbsdI0w/bga20kODD
 
 def decode_pdf417(image_file, license_key=''):
     """Decode PDF417 code from image"""
+    from dbr import BarcodeReader
+
     key = "DLS2eyJoYW5kc2hha2VDb2RlIjoiMjAwMDAxLTE2NDk4Mjk3OTI2MzUiLCJvcmdhbml6YXRpb25JRCI6IjIwMDAwMSIsInNlc3Npb25QYXNzd29yZCI6IndTcGR6Vm05WDJrcEQ5YUoifQ=="
     if license_key != '':
         key = license_key
@@ -52,6 +53,8 @@ def decode_pdf417(image_file, license_key=''):
 
 def decrypt_data(data):
     """Decrypt data"""
+    import rsa
+
     header = data[0:6]
     pk128 = pk_v1_128
     pk74 = pk_v1_74
@@ -206,38 +209,7 @@ def parse_data(data):
     index += 1
     
     # Extract image data
-    image_bytes = None
-    image_format = "unknown"
-    
-    # Look for JPEG
-    jpeg_start = -1
-    for i in range(index, len(data) - 2):
-        if data[i] == 0xFF and data[i+1] == 0xD8 and data[i+2] == 0xFF:
-            jpeg_start = i
-            break
-    
-    if jpeg_start != -1:
-        jpeg_end = -1
-        for i in range(jpeg_start + 2, len(data) - 1):
-            if data[i] == 0xFF and data[i+1] == 0xD9:
-                jpeg_end = i + 2
-                break
-        if jpeg_end != -1:
-            image_bytes = data[jpeg_start:jpeg_end]
-            image_format = "jpeg"
-            print(f"📸 Extracted JPEG image: {len(image_bytes)} bytes")
-    
-    # Handle raw image data
-    if image_bytes is None:
-        remaining_data = data[index:]
-        print(f"🔍 Raw image data analysis:")
-        print(f"   - Expected size for {width}x{height} RGB: {width * height * 3} bytes")
-        print(f"   - Expected size for {width}x{height} grayscale: {width * height} bytes") 
-        print(f"   - Actual available: {len(remaining_data)} bytes")
-        
-        image_bytes = remaining_data
-        image_format = "raw"
-        print(f"📸 Extracted raw image data: {len(image_bytes)} bytes")
+    image_bytes, image_format = extract_image(data, index)
     
     return DrivingLicense(
         vehicleCodes, surname, initials, PrDPCode, idCountryOfIssue, 
@@ -315,7 +287,7 @@ Image height: {self.image_height}'''
             return False
             
         try:
-            if self.image_format == "jpeg" or self.image_bytes.startswith(b'\xff\xd8'):
+            if self.image_format == "jpeg" or sniff_format(self.image_bytes) == "jpeg":
                 full_filename = filename + '.jpg'
                 with open(full_filename, 'wb') as f:
                     f.write(self.image_bytes)
@@ -344,6 +316,8 @@ Image height: {self.image_height}'''
     
     def _convert_raw_image(self, filename):
         """Try to convert raw image data to proper formats"""
+        from PIL import Image
+
         try:
             raw_data = self.image_bytes
             width = self.image_width
@@ -491,25 +465,20 @@ def debug_license_structure(hex_string):
         print("🔍 Debugging license structure:")
         print(f"Total decrypted bytes: {len(decrypted_data)}")
         
-        jpeg_start = decrypted_data.find(b'\xff\xd8')
-        if jpeg_start != -1:
-            print(f"📍 JPEG start found at position: {jpeg_start}")
-            jpeg_end = decrypted_data.find(b'\xff\xd9', jpeg_start)
-            if jpeg_end != -1:
-                print(f"📍 JPEG end found at position: {jpeg_end}")
-                image_size = jpeg_end + 2 - jpeg_start
-                print(f"📸 JPEG image size: {image_size} bytes")
-                image_data = decrypted_data[jpeg_start:jpeg_end+2]
-                with open('debug_license_image.jpg', 'wb') as f:
-                    f.write(image_data)
-                print("💾 Debug image saved as: debug_license_image.jpg")
-        
-        png_start = decrypted_data.find(b'\x89PNG')
-        if png_start != -1:
-            print(f"📍 PNG header found at position: {png_start}")
+        offset, width, height = image_section(decrypted_data)
+        image_data, image_format = extract_image(decrypted_data, offset)
+        print(f"📍 Image section: {width}x{height}, data at position {offset}")
+        print(f"📸 {image_format.upper()} image: {len(image_data)} bytes")
+        if image_format == 'jpeg':
+            with open('debug_license_image.jpg', 'wb') as f:
+                f.write(image_data)
+            print("💾 Debug image saved as: debug_license_image.jpg")
             
-        print("\nFirst 100 bytes of decrypted data (hex):")
-        print(decrypted_data[:100].hex())
+        # Every parsed field up to the start of the image data, with its boundaries marked
+        spans = layout(decrypted_data)
+        print("\nDecrypted data up to the image section:")
+        for line in dump(decrypted_data, end=spans.get('image', (len(decrypted_data),))[0], spans=spans):
+            print(line)
         
     except Exception as e:
         print(f"❌ Debug error: {e}")
@@ -525,41 +494,53 @@ def analyze_and_decode_image(raw_data, width, height, filename='license_photo'):
     print(f"   First 50 bytes (hex): {raw_data[:50].hex()}")
     print(f"   First 50 bytes (decimal): {list(raw_data[:50])}")
     
-    # Check for common compression markers
-    if raw_data[0] == 0x57 and raw_data[1] == 0x04:
-        print("   ⚡ Detected potential RLE or custom compression format")
-        return decode_compressed_image(raw_data, width, height, filename)
+    # Only run the decoder for the detected format; try them all if none stands out
+    from sadl.classify import classify
+
+    image_format, confidence = classify(raw_data)[0]
+    print(f"   Detected format: {image_format} ({confidence:.0%})")
+    if image_format in ("jpeg", "png", "bmp"):
+        image, image_format = extract_image(raw_data)
+        full_filename = f"{filename}.{image_format}"
+        with open(full_filename, 'wb') as f:
+            f.write(image)
+        print(f"   💾 Embedded image saved as: {full_filename}")
+        return full_filename
+    elif image_format == "text":
+        print("   ⚡ Text or metadata, not pixels")
+        return None
+    elif image_format == "rle":
+        results = decode_compressed_image(raw_data, width, height, filename)
+    elif image_format == "packed":
+        results = decode_1bit_image(raw_data, width, height, filename)
     else:
-        # Try different decoding approaches
-        return try_multiple_decodings(raw_data, width, height, filename)
+        results = try_multiple_decodings(raw_data, width, height, filename)
+
+    # The decoders only queue their PNGs; wait for all of them once
+    from sadl.results import get_writer
+
+    try:
+        get_writer().flush()
+    except Exception as e:
+        print(f"   ❌ Failed to write decoded images: {e}")
+        return None
+    if results:
+        print(f"   💾 Decoded images written")
+    return results
 
 def decode_compressed_image(raw_data, width, height, filename):
     """Attempt to decode the compressed image format"""
+    from sadl.rle import decode
+
     try:
         print("   🎯 Attempting RLE (Run-Length Encoding) decompression...")
         
-        decompressed = bytearray()
-        i = 0
-        
-        while i < len(raw_data):
-            if i + 1 < len(raw_data):
-                # Try RLE format: [value, count]
-                value = raw_data[i]
-                count = raw_data[i + 1]
-                
-                # Validate count
-                if count > 0 and count < 250:  # Reasonable range
-                    decompressed.extend([value] * count)
-                    i += 2
-                    continue
-            
-            # If not RLE, just copy the byte
-            decompressed.append(raw_data[i])
-            i += 1
+        # [value, count] pairs with counts below 250, other bytes copied
+        decompressed = decode(raw_data, 'value-count', limit=width * height, max_count=249)
         
         if len(decompressed) >= width * height:
             print(f"   ✅ RLE decompression successful: {len(decompressed)} bytes")
-            return save_grayscale_image(decompressed, width, height, filename + '_rle')
+            return save_grayscale_image(decompressed.tobytes(), width, height, filename + '_rle')
         else:
             print(f"   ❌ RLE decompression insufficient: {len(decompressed)} bytes")
             return None
@@ -568,24 +549,29 @@ def decode_compressed_image(raw_data, width, height, filename):
         print(f"   ❌ RLE decompression failed: {e}")
         return None
 
-def try_multiple_decodings(raw_data, width, height, filename):
-    """Try multiple image decoding approaches"""
-    results = []
-    
-    # Approach 1: Direct grayscale (if data matches)
-    if len(raw_data) == width * height:
-        results.append(save_grayscale_image(raw_data, width, height, filename + '_direct'))
-    
-    # Approach 2: Try as packed bits (1-bit per pixel)
-    elif len(raw_data) * 8 >= width * height:
-        result = decode_1bit_image(raw_data, width, height, filename)
-        if result:
-            results.append(result)
-    
-    # Approach 3: Try different RLE variations
-    result = decode_rle_variations(raw_data, width, height, filename)
-    if result:
-        results.append(result)
+def _direct_image(raw_data, width, height):
+    return raw_data if len(raw_data) == width * height else None
+
+def _1bit_pixels(raw_data, width, height):
+    from sadl.pixels import unpack_pixels
+
+    return unpack_pixels(raw_data, 1, width, height, pad=0) if len(raw_data) * 8 >= width * height else None
+
+def try_multiple_decodings(raw_data, width, height, filename, top=3):
+    """Try multiple image decoding approaches, saving only the best scoring ones"""
+    from sadl import tournament
+
+    decoders = [
+        ("Direct", _direct_image),
+        ("1bit", _1bit_pixels),
+        ("Standard RLE", decode_standard_rle),
+        ("Count-Value RLE", decode_count_value_rle),
+        ("Value-Count RLE", decode_value_count_rle),
+    ]
+    candidates = tournament.run(raw_data, width, height, decoders, top=top)
+    for candidate in candidates:
+        print(f"   🏆 {candidate.name}: score {candidate.score:.3f}")
+    results = [name for decoder, name in tournament.save(candidates, filename)]
     
     # Approach 4: Save raw data for external analysis
     raw_filename = filename + '_raw.bin'
@@ -597,30 +583,15 @@ def try_multiple_decodings(raw_data, width, height, filename):
 
 def decode_1bit_image(raw_data, width, height, filename):
     """Decode 1-bit per pixel image"""
+    from sadl.pixels import unpack_pixels
+
     try:
         print("   🎯 Attempting 1-bit per pixel decoding...")
         
-        total_pixels = width * height
-        total_bits = len(raw_data) * 8
-        
-        if total_bits >= total_pixels:
-            # Convert to 8-bit grayscale
-            output = bytearray()
-            bit_pos = 0
-            
-            for _ in range(total_pixels):
-                byte_idx = bit_pos // 8
-                bit_idx = bit_pos % 8
-                
-                if byte_idx < len(raw_data):
-                    bit = (raw_data[byte_idx] >> (7 - bit_idx)) & 1
-                    output.append(255 if bit else 0)  # Black or white
-                else:
-                    output.append(0)  # Padding
-                
-                bit_pos += 1
-            
-            return save_grayscale_image(output, width, height, filename + '_1bit')
+        if len(raw_data) * 8 >= width * height:
+            # Convert to 8-bit grayscale, set bits white
+            output = unpack_pixels(raw_data, 1, width, height, pad=0)
+            return save_grayscale_image(output.tobytes(), width, height, filename + '_1bit')
         
     except Exception as e:
         print(f"   ❌ 1-bit decoding failed: {e}")
@@ -649,81 +620,32 @@ def decode_rle_variations(raw_data, width, height, filename):
 
 def decode_standard_rle(raw_data, width, height):
     """Standard RLE: [value, count] pairs"""
-    output = bytearray()
-    i = 0
-    
-    while i < len(raw_data):
-        if i + 1 < len(raw_data):
-            value = raw_data[i]
-            count = raw_data[i + 1]
-            
-            if count > 0:
-                output.extend([value] * count)
-                i += 2
-                continue
-        
-        output.append(raw_data[i])
-        i += 1
-    
-    return output
+    from sadl.rle import decode
+
+    return decode(raw_data, 'value-count', limit=width * height).tobytes()
 
 def decode_count_value_rle(raw_data, width, height):
     """RLE: [count, value] pairs"""
-    output = bytearray()
-    i = 0
-    
-    while i < len(raw_data):
-        if i + 1 < len(raw_data):
-            count = raw_data[i]
-            value = raw_data[i + 1]
-            
-            if count > 0:
-                output.extend([value] * count)
-                i += 2
-                continue
-        
-        output.append(raw_data[i])
-        i += 1
-    
-    return output
+    from sadl.rle import decode
+
+    return decode(raw_data, 'count-value', limit=width * height).tobytes()
 
 def decode_value_count_rle(raw_data, width, height):
     """RLE with special markers"""
-    output = bytearray()
-    i = 0
-    
-    while i < len(raw_data):
-        current = raw_data[i]
-        
-        if current == 0x00 and i + 1 < len(raw_data):  # Potential RLE marker
-            count = raw_data[i + 1]
-            if count > 0 and i + 2 < len(raw_data):
-                value = raw_data[i + 2]
-                output.extend([value] * count)
-                i += 3
-                continue
-        
-        output.append(current)
-        i += 1
-    
-    return output
+    from sadl.rle import decode
+
+    return decode(raw_data, 'marker', limit=width * height).tobytes()
 
 def save_grayscale_image(data, width, height, filename):
-    """Save data as grayscale image"""
+    """Queue data as a grayscale PNG on the shared image writer, padded with zeros
+
+    The file is written in the background; flush the writer before using it.
+    """
+    from sadl.results import ImageResult, save
+
     try:
-        # Ensure we have enough data
-        required_size = width * height
-        if len(data) < required_size:
-            # Pad with zeros
-            data = data + b'\x00' * (required_size - len(data))
-        elif len(data) > required_size:
-            # Truncate
-            data = data[:required_size]
-        
-        img = Image.frombytes('L', (width, height), bytes(data))
-        full_filename = filename + '.png'
-        img.save(full_filename)
-        print(f"   💾 Grayscale image saved as: {full_filename}")
+        full_filename = save(ImageResult.from_bytes(filename, data, width, height, pad=0), filename + '.png')
+        print(f"   💾 Grayscale image queued as: {full_filename}")
         return full_filename
         
     except Exception as e:
@@ -776,13 +698,15 @@ def analyze_image_data(self):
     print(f"   Compression ratio: {len(self.image_bytes) / (self.image_width * self.image_height):.2%}")
     
     # Analyze byte distribution
-    unique_bytes = len(set(self.image_bytes))
-    print(f"   Unique byte values: {unique_bytes}")
+    from sadl.bytestats import byte_stats
+
+    stats = byte_stats(self.image_bytes)
+    print(f"   Unique byte values: {stats.unique}")
     
     # Check for patterns
     if all(b in [0, 255] for b in self.image_bytes[:100]):
         print("   Pattern: Likely binary (black/white) image")
-    elif max(self.image_bytes) <= 1:
+    elif stats.maximum <= 1:
         print("   Pattern: Likely 1-bit image")
     else:
         print("   Pattern: Grayscale or custom format")
@@ -796,10 +720,8 @@ def analyze_image_data(self):
         f.write(f"Data size: {len(self.image_bytes)} bytes\n")
         f.write(f"Expected size: {self.image_width * self.image_height} bytes\n")
         f.write(f"Compression: {len(self.image_bytes) / (self.image_width * self.image_height):.2%}\n")
-        f.write(f"\nFirst 100 bytes (hex):\n")
-        f.write(self.image_bytes[:100].hex() + '\n')
-        f.write(f"\nFirst 100 bytes (decimal):\n")
-        f.write(str(list(self.image_bytes[:100])) + '\n')
+        f.write(f"\nImage data (hex):\n")
+        f.writelines(line + '\n' for line in dump(self.image_bytes))
     
     print(f"   📄 Detailed analysis saved as: {analysis_file}")
     # Add this to your main code after the license is parsed:
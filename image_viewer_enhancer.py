@@ -1,7 +1,9 @@
 # Create: image_viewer_enhancer.py
 
 from PIL import Image, ImageFilter, ImageEnhance
+import numpy as np
 import os
+from sadl.results import ImageResult, get_writer, save
 
 def display_image_info(filename):
     """Display information about decoded images"""
@@ -37,9 +39,10 @@ def enhance_decoded_images():
     base_files = ["license_photo_differential.png", "license_photo_histogram.png"]
     
     for filename in base_files:
-        if os.path.exists(filename):
+        path = os.path.join(get_writer().directory, filename)
+        if os.path.exists(path):
             print(f"\n🔄 Enhancing {filename}...")
-            img = Image.open(filename)
+            img = Image.open(path).convert('L')
             
             # Apply various enhancements
             enhancements = [
@@ -49,18 +52,13 @@ def enhance_decoded_images():
                 ("inverted", Image.eval(img, lambda x: 255 - x)),
             ]
             
+            # Also try edge detection to see structure
+            enhancements.append(("edges", img.filter(ImageFilter.FIND_EDGES)))
+            
             for name, enhanced_img in enhancements:
-                enhanced_filename = f"enhanced_{name}_{filename}"
-                enhanced_img.save(enhanced_filename)
+                enhanced_filename = save(ImageResult(name, np.asarray(enhanced_img)), f"enhanced_{name}_{filename}")
                 enhanced_files.append(enhanced_filename)
                 print(f"   💾 {enhanced_filename}")
-            
-            # Also try edge detection to see structure
-            edges = img.filter(ImageFilter.FIND_EDGES)
-            edges_filename = f"enhanced_edges_{filename}"
-            edges.save(edges_filename)
-            enhanced_files.append(edges_filename)
-            print(f"   💾 {edges_filename}")
     
     return enhanced_files
 
@@ -71,8 +69,9 @@ def analyze_decoding_quality():
     
     # Check file sizes to see if we got reasonable images
     for filename in ["license_photo_differential.png", "license_photo_histogram.png"]:
-        if os.path.exists(filename):
-            file_size = os.path.getsize(filename)
+        path = os.path.join(get_writer().directory, filename)
+        if os.path.exists(path):
+            file_size = os.path.getsize(path)
             print(f"📁 {filename}: {file_size} bytes")
             
             # A proper 250x200 grayscale PNG should be > 10KB
@@ -88,10 +87,11 @@ def create_comparison_grid():
     
     image_files = []
     
-    # Find all PNG files in current directory
-    for file in os.listdir('.'):
+    # Find all PNG files in the output directory
+    directory = get_writer().directory
+    for file in os.listdir(directory):
         if file.endswith('.png') and ('license_photo' in file or 'enhanced' in file):
-            image_files.append(file)
+            image_files.append(os.path.join(directory, file))
     
     if not image_files:
         print("❌ No decoded images found")
@@ -131,11 +131,11 @@ def create_comparison_grid():
         
         grid.paste(img, (x, y))
     
-    grid.save("decoding_comparison.png")
-    print("💾 Comparison grid saved: decoding_comparison.png")
+    filename = save(ImageResult("decoding_comparison", np.asarray(grid)))
+    print(f"💾 Comparison grid saved: {filename}")
 
 def improve_differential_decoding(raw_data, width=250, height=200):
-    """Improve the differential decoding that worked"""
+    """Improve the differential decoding that worked, one ImageResult per background"""
     print("\n🔄 IMPROVING DIFFERENTIAL DECODING")
     print("=" * 50)
     
@@ -144,6 +144,7 @@ def improve_differential_decoding(raw_data, width=250, height=200):
     
     # Start with different backgrounds to see what works best
     backgrounds = [255, 0, 128]  # White, black, gray
+    results = []
     
     for bg_val in backgrounds:
         print(f"  Trying background: {bg_val} ({'white' if bg_val == 255 else 'black' if bg_val == 0 else 'gray'})")
@@ -178,22 +179,10 @@ def improve_differential_decoding(raw_data, width=250, height=200):
                 else:
                     ptr += 1
         
-        # Save this version
-        filename = f"improved_bg_{bg_val}.png"
-        save_grayscale_image(bytes(output), width, height, filename)
-        print(f"    💾 {filename}")
-
-def save_grayscale_image(data, width, height, filename):
-    """Save grayscale image with proper size"""
-    from PIL import Image
-    # Ensure correct size
-    if len(data) < width * height:
-        data = data + b'\xFF' * (width * height - len(data))
-    elif len(data) > width * height:
-        data = data[:width * height]
-    
-    img = Image.frombytes('L', (width, height), bytes(data))
-    img.save(filename)
+        # Keep this version
+        results.append(ImageResult.from_bytes(f"improved_bg_{bg_val}", output, width, height, background=bg_val))
+    
+    return results
 
 # Main analysis function
 def comprehensive_image_review(license_data):
@@ -208,10 +197,11 @@ def comprehensive_image_review(license_data):
     print("🎯 COMPREHENSIVE IMAGE REVIEW")
     print("=" * 60)
     
-    # 1. Display info about decoded images
+    # 1. Display info about decoded images, once queued writes are on disk
     print("\n1. 📊 DECODED IMAGE ANALYSIS")
+    get_writer().flush()
     for filename in ["license_photo_differential.png", "license_photo_histogram.png"]:
-        display_image_info(filename)
+        display_image_info(os.path.join(get_writer().directory, filename))
     
     # 2. Analyze decoding quality
     analyze_decoding_quality()
@@ -220,9 +210,11 @@ def comprehensive_image_review(license_data):
     enhanced_files = enhance_decoded_images()
     
     # 4. Improve the working decoding method
-    improve_differential_decoding(raw_data, width, height)
+    for result in improve_differential_decoding(raw_data, width, height):
+        print(f"    💾 {save(result)}")
     
     # 5. Create comparison
+    get_writer().flush()
     create_comparison_grid()
     
     print(f"\n🎉 REVIEW COMPLETE!")
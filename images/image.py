@@ -1,9 +1,8 @@
 from sadl import parse_file
-import cv2
-import numpy as np
 
 def extract_license_photo(license_image_path, license_key):
     """Extract the photo from the license image"""
+    import cv2
     
     # First, get the license data to know the image dimensions
     license_data = parse_file(license_image_path, encrypted=True, license=license_key)
@@ -66,6 +65,8 @@ def extract_license_photo(license_image_path, license_key):
 
 def auto_detect_face_photo(license_image_path):
     """Try to automatically detect and extract face photo"""
+    import cv2
+
     img = cv2.imread(license_image_path)
     if img is None:
         return None
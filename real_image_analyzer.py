@@ -1,6 +1,10 @@
 # Create: fixed_image_analyzer.py
-from PIL import Image
-import struct
+import numpy as np
+
+from sadl import tournament
+from sadl.bytestats import byte_stats
+from sadl.pixels import plot
+from sadl.results import ImageResult
 
 def analyze_actual_image_data(raw_data, width=250, height=200):
     """Actually figure out what the 611 bytes represent"""
@@ -16,9 +20,8 @@ def analyze_actual_image_data(raw_data, width=250, height=200):
     # Let's check what the data actually contains
     
     # 1. Check if it's a sparse image (mostly one color)
-    from collections import Counter
-    byte_counts = Counter(raw_data)
-    most_common = byte_counts.most_common(10)
+    stats = byte_stats(raw_data)
+    most_common = stats.most_common(10)
     
     print("Most common bytes:")
     for byte_val, count in most_common:
@@ -29,23 +32,16 @@ def analyze_actual_image_data(raw_data, width=250, height=200):
     print(f"\nPattern analysis:")
     
     # Check for coordinate patterns (pairs of bytes that could be x,y coordinates)
-    coord_pairs = 0
-    for i in range(0, len(raw_data)-1, 2):
-        if raw_data[i] < width and raw_data[i+1] < height:
-            coord_pairs += 1
+    pairs = stats.values[:len(raw_data) // 2 * 2].reshape(-1, 2)
+    coord_pairs = int(((pairs[:, 0] < width) & (pairs[:, 1] < height)).sum())
     
     print(f"  Potential coordinate pairs: {coord_pairs}")
     
     # Check if bytes are mostly in printable ASCII range (might be text)
-    printable = sum(1 for b in raw_data if 32 <= b <= 126)
-    print(f"  Printable ASCII characters: {printable} ({printable/len(raw_data)*100:.1f}%)")
+    print(f"  Printable ASCII characters: {stats.printable} ({stats.printable_ratio*100:.1f}%)")
     
     # Check for sequential patterns
-    sequences = 0
-    for i in range(len(raw_data) - 2):
-        if abs(raw_data[i] - raw_data[i+1]) <= 2 and abs(raw_data[i+1] - raw_data[i+2]) <= 2:
-            sequences += 1
-    print(f"  Sequential patterns: {sequences}")
+    print(f"  Sequential patterns: {stats.smooth}")
     
     return most_common
 
@@ -53,65 +49,37 @@ def decode_as_line_image(raw_data, width=250, height=200):
     """Decode as a single line image (611x1) and display as a row"""
     print("🎯 Decoding as single line image (611x1)...")
     
-    # Create output image with the line at the top
-    output = bytearray(width * height)
-    
-    # Fill with white background
-    for i in range(len(output)):
-        output[i] = 255
+    # White canvas with the line data in the top row
+    output = np.full((height, width), 255, dtype=np.uint8)
+    line = np.frombuffer(raw_data, dtype=np.uint8)[:width]
+    output[0, :len(line)] = line
     
-    # Copy the line data to the top row
-    line_length = min(len(raw_data), width)
-    for x in range(line_length):
-        output[x] = raw_data[x]
-    
-    filename = "single_line_image.png"
-    save_grayscale_image(bytes(output), width, height, filename)
-    print(f"  💾 {filename}")
-    return filename
+    return output
 
 def decode_as_coordinate_map(raw_data, width=250, height=200):
     """Try to interpret as coordinate-value pairs"""
     print("🎯 Attempting coordinate-value pair decoding...")
     
     # Create blank canvas
-    output = bytearray(width * height)
-    for i in range(len(output)):
-        output[i] = 255  # White background
+    output = np.full((height, width), 255, dtype=np.uint8)
+    data = np.frombuffer(raw_data, dtype=np.uint8)
     
     points_plotted = 0
     
     # Try different interpretations of the data
     # Option 1: [x, y, value] triplets
-    if len(raw_data) % 3 == 0:
+    if len(data) % 3 == 0:
         print("  Trying [x, y, value] triplets...")
-        for i in range(0, len(raw_data)-2, 3):
-            x = raw_data[i] % width
-            y = raw_data[i+1] % height
-            value = raw_data[i+2]
-            
-            pos = y * width + x
-            if pos < len(output):
-                output[pos] = value
-                points_plotted += 1
+        points_plotted = plot(output, data[0::3], data[1::3], data[2::3])
     
     # Option 2: [x, y] pairs (assume constant value)
-    elif len(raw_data) % 2 == 0:
+    elif len(data) % 2 == 0:
         print("  Trying [x, y] pairs...")
-        for i in range(0, len(raw_data)-1, 2):
-            x = raw_data[i] % width
-            y = raw_data[i+1] % height
-            
-            pos = y * width + x
-            if pos < len(output):
-                output[pos] = 0  # Black dots
-                points_plotted += 1
+        points_plotted = plot(output, data[0::2], data[1::2], 0)  # Black dots
     
     if points_plotted > 0:
-        filename = f"coordinate_map_{points_plotted}_points.png"
-        save_grayscale_image(bytes(output), width, height, filename)
         print(f"  ✅ Plotted {points_plotted} points")
-        return filename
+        return ImageResult('Coordinate Map', output, points=points_plotted)
     
     return None
 
@@ -120,60 +88,36 @@ def decode_as_compressed_signature(raw_data, width=250, height=200):
     print("🎯 Attempting to decode as compressed signature...")
     
     # Create output
-    output = bytearray(width * height)
-    for i in range(len(output)):
-        output[i] = 255  # White background
+    output = np.full((height, width), 255, dtype=np.uint8)
+    data = np.frombuffer(raw_data, dtype=np.uint8).astype(np.intp)
     
     # Try to interpret as a sparse signature
-    # Use the data to draw lines or points
-    for i in range(len(raw_data)):
-        # Use byte value to determine position and intensity
-        x = (i * width) // len(raw_data)
-        y = (raw_data[i] * height) // 255
-        
-        # Draw a vertical line at this position
-        for dy in range(-2, 3):
-            y_pos = min(max(y + dy, 0), height-1)
-            pos = y_pos * width + x
-            if pos < len(output):
-                # Darker for higher values
-                intensity = 255 - min(raw_data[i] * 2, 255)
-                output[pos] = min(output[pos], intensity)
-    
-    filename = "signature_style.png"
-    save_grayscale_image(bytes(output), width, height, filename)
-    print(f"  💾 {filename}")
-    return filename
+    # Byte index gives the column, byte value the row and intensity
+    x = np.arange(len(data)) * width // max(len(data), 1)
+    y = data * height // 255
+    # Darker for higher values
+    intensity = (255 - np.minimum(data * 2, 255)).astype(np.uint8)
+    
+    # Draw a 5 pixel vertical line at each position, clipped to the canvas
+    rows = np.clip(y[:, None] + np.arange(-2, 3), 0, height - 1)
+    np.minimum.at(output, (rows, x[:, None]), intensity[:, None])
+    
+    return output
 
 def decode_as_data_visualization(raw_data, width=250, height=200):
     """Create a visualization of the raw data itself"""
     print("🎯 Creating data visualization...")
     
-    output = bytearray(width * height)
+    # Gradient background, (x + y) % 256 by uint8 wraparound
+    output = np.add.outer(np.arange(height).astype(np.uint8), np.arange(width).astype(np.uint8))
     
-    # Fill with gradient background
-    for y in range(height):
-        for x in range(width):
-            output[y * width + x] = (x + y) % 256
+    # Overlay the actual data values as 3x3 black points
+    data = np.frombuffer(raw_data, dtype=np.uint8).astype(np.intp)
+    x = np.arange(len(data)) * width // max(len(data), 1)
+    y = data * height // 255
+    plot(output, x, y, 0, radius=1)
     
-    # Overlay the actual data values
-    for i, byte_val in enumerate(raw_data):
-        x = (i * width) // len(raw_data)
-        y = (byte_val * height) // 255
-        
-        # Draw a point
-        for dy in range(-1, 2):
-            for dx in range(-1, 2):
-                x_pos = (x + dx) % width
-                y_pos = (y + dy) % height
-                pos = y_pos * width + x_pos
-                if pos < len(output):
-                    output[pos] = 0  # Black point
-    
-    filename = "data_visualization.png"
-    save_grayscale_image(bytes(output), width, height, filename)
-    print(f"  💾 {filename}")
-    return filename
+    return output
 
 def decode_as_text_or_binary(raw_data, width=250, height=200):
     """Check if this might be text or binary data, not an image"""
@@ -181,7 +125,7 @@ def decode_as_text_or_binary(raw_data, width=250, height=200):
     
     # Convert to string to check for text patterns
     try:
-        text = raw_data.decode('ascii', errors='replace')
+        text = bytes(raw_data).decode('ascii', errors='replace')
         printable_count = sum(1 for c in text if c.isprintable() or c in ' \t\n\r')
         
         print(f"  Printable characters: {printable_count}/{len(raw_data)} ({printable_count/len(raw_data)*100:.1f}%)")
@@ -194,27 +138,14 @@ def decode_as_text_or_binary(raw_data, width=250, height=200):
     except:
         print("  Not primarily ASCII text")
     
-    # Create a visualization of the binary data
-    output = bytearray(width * height)
-    for i in range(len(output)):
-        output[i] = 255  # White background
-    
-    # Draw the bytes as a binary map
-    bytes_per_row = min(width, len(raw_data))
-    rows = min(height, (len(raw_data) + bytes_per_row - 1) // bytes_per_row)
-    
-    for row in range(rows):
-        for col in range(bytes_per_row):
-            idx = row * bytes_per_row + col
-            if idx < len(raw_data):
-                output[row * width + col] = raw_data[idx]
-    
-    filename = "binary_data_map.png"
-    save_grayscale_image(bytes(output), width, height, filename)
-    print(f"  💾 {filename}")
-    return filename
+    # Show the bytes as a binary map, row by row on a white canvas
+    output = np.full((height, width), 255, dtype=np.uint8)
+    data = np.frombuffer(raw_data, dtype=np.uint8)[:width * height]
+    output.reshape(-1)[:len(data)] = data
+    
+    return output
 
-def real_image_decoding(license_data):
+def real_image_decoding(license_data, top=3):
     """Main function for real image decoding"""
     if not license_data or not license_data.image_bytes:
         return None
@@ -229,36 +160,21 @@ def real_image_decoding(license_data):
     # First, understand what we're dealing with
     most_common = analyze_actual_image_data(raw_data, width, height)
     
-    # Try different interpretations
-    results = []
-    
     print(f"\n🔄 ATTEMPTING VARIOUS DECODING METHODS")
     print("=" * 50)
     
-    # Method 1: Single line image
-    line_result = decode_as_line_image(raw_data, width, height)
-    if line_result:
-        results.append(("Single Line", line_result))
-    
-    # Method 2: Coordinate map
-    coord_result = decode_as_coordinate_map(raw_data, width, height)
-    if coord_result:
-        results.append(("Coordinate Map", coord_result))
-    
-    # Method 3: Signature style
-    sig_result = decode_as_compressed_signature(raw_data, width, height)
-    if sig_result:
-        results.append(("Signature", sig_result))
-    
-    # Method 4: Data visualization
-    viz_result = decode_as_data_visualization(raw_data, width, height)
-    if viz_result:
-        results.append(("Data Visualization", viz_result))
-    
-    # Method 5: Text/binary analysis
-    text_result = decode_as_text_or_binary(raw_data, width, height)
-    if text_result:
-        results.append(("Binary Data", text_result))
+    # Render every interpretation in memory, save only the best scoring ones
+    methods = [
+        ("Single Line", decode_as_line_image),
+        ("Coordinate Map", decode_as_coordinate_map),
+        ("Signature", decode_as_compressed_signature),
+        ("Data Visualization", decode_as_data_visualization),
+        ("Binary Data", decode_as_text_or_binary),
+    ]
+    candidates = tournament.run(raw_data, width, height, methods, top=top)
+    for candidate in candidates:
+        print(f"  🏆 {candidate.name}: score {candidate.score:.3f}")
+    results = tournament.save(candidates, "real_image")
     
     # Summary
     print(f"\n📊 DECODING SUMMARY")
@@ -282,15 +198,3 @@ def real_image_decoding(license_data):
     print(f"  - The actual photo may be stored elsewhere")
     
     return results
-
-def save_grayscale_image(data, width, height, filename):
-    """Save grayscale image with proper size"""
-    from PIL import Image
-    # Ensure correct size
-    if len(data) < width * height:
-        data = data + b'\xFF' * (width * height - len(data))
-    elif len(data) > width * height:
-        data = data[:width * height]
-    
-    img = Image.frombytes('L', (width, height), bytes(data))
-    img.save(filename)
\ No newline at end of file
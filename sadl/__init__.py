@@ -1,9 +1,8 @@
 # https://github.com/ugommirikwe/sa-license-decoder/blob/master/SPEC.md
 
 import base64
-import rsa
 from pathlib import Path
-from dbr import *
+from . import metrics
 
 __version__ = '0.1.1'
 
@@ -34,7 +33,40 @@ MF8CSwC0BKDfEdHKz/GhoEjU1XP5U6YsWD10klknVhpteh4rFAQlJq9wtVBUc5DqbsdI0w/bga20kODD
 -----END RSA PUBLIC KEY-----
 '''
 
+default_license = "DLS2eyJoYW5kc2hha2VDb2RlIjoiMjAwMDAxLTE2NDk4Mjk3OTI2MzUiLCJvcmdhbml6YXRpb25JRCI6IjIwMDAwMSIsInNlc3Npb25QYXNzd29yZCI6IndTcGR6Vm05WDJrcEQ5YUoifQ=="
 
+_public_keys = {}
+
+
+def load_public_key(pem):
+    """Load a PEM encoded RSA public key, parsing each key only once
+
+    Args:
+        pem (str): PEM encoded key
+
+    Returns:
+        rsa.PublicKey: public key
+    """
+    key = _public_keys.get(pem)
+    if key is None:
+        import rsa
+        key = _public_keys[pem] = rsa.PublicKey.load_pkcs1(pem)
+    return key
+
+
+def __getattr__(name):
+    # The Dynamsoft SDK used to be star-imported here. Load it on first use so
+    # that parsing base64/raw payloads never pays for the native library.
+    if name.startswith('__'):
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    import dbr
+    try:
+        return getattr(dbr, name)
+    except AttributeError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+
+
+@metrics.timed('decode_pdf417')
 def decode_pdf417(image_file, license_key=''):
     """Decode PDF417 code from image
 
@@ -44,7 +76,9 @@ def decode_pdf417(image_file, license_key=''):
     Returns: 
         bytes: raw data
     """
-    key = "DLS2eyJoYW5kc2hha2VDb2RlIjoiMjAwMDAxLTE2NDk4Mjk3OTI2MzUiLCJvcmdhbml6YXRpb25JRCI6IjIwMDAwMSIsInNlc3Npb25QYXNzd29yZCI6IndTcGR6Vm05WDJrcEQ5YUoifQ=="
+    from dbr import BarcodeReader
+
+    key = default_license
     if (license_key != ''):
         key = license_key
     BarcodeReader.init_license(key)
@@ -64,6 +98,30 @@ def decrypt_data(data):
     Returns: 
         bytes: decrypted data
     """
+    out = bytearray(714)
+    decrypt_into(data, out)
+    return out
+
+@metrics.timed('decrypt_data')
+def decrypt_into(data, out):
+    """Decrypt data into a caller-supplied buffer
+
+    Neither buffer is copied as a whole, so a batch can decrypt straight
+    into rows of a preallocated N x 714 arena, e.g. a NumPy uint8 matrix.
+
+    Args:
+        data (bytes-like): 720 bytes of raw data: bytes, bytearray, memoryview
+            or a contiguous uint8 NumPy array
+        out (writable bytes-like): at least 714 bytes: bytearray, memoryview
+            or a contiguous uint8 NumPy array
+        
+    Returns: 
+        memoryview: the 714 decrypted bytes at the start of out
+    """
+    data = memoryview(data).cast('B')
+    out = memoryview(out).cast('B')
+    if len(out) < 714:
+        raise ValueError(f'Output buffer needs 714 bytes, got {len(out)}')
     
     header = data[0: 6]
     pk128 = pk_v1_128
@@ -75,30 +133,29 @@ def decrypt_data(data):
     elif header[0] == v2[0] and header[1] == v2[1] and header[2] == v2[2] and header[3] == v2[3]:
         pk128 = pk_v2_128
         pk74 = pk_v2_74
+    else:
+        # Unknown versions are still decrypted with the v1 keys
+        metrics.failure('unknown_header')
     
-    all = bytearray()
-    
-    pubKey = rsa.PublicKey.load_pkcs1(pk128)
+    pubKey = load_public_key(pk128)
     start = 6
     for i in range(5):
         block = data[start: start + 128]
         input = int.from_bytes(block, byteorder='big', signed=False)
         output = pow(input, pubKey.e, mod=pubKey.n)
         
-        decrypted_bytes = output.to_bytes(128, byteorder='big', signed=False)
-        all += decrypted_bytes
+        out[i * 128: (i + 1) * 128] = output.to_bytes(128, byteorder='big', signed=False)
         
         start = start + 128
     
-    pubKey = rsa.PublicKey.load_pkcs1(pk74)
+    pubKey = load_public_key(pk74)
     block = data[start: start + 74]
     input = int.from_bytes(block, byteorder='big', signed=False)
     output = pow(input, pubKey.e, mod=pubKey.n)
     
-    decrypted_bytes = output.to_bytes(74, byteorder='big', signed=False)
-    all += decrypted_bytes
+    out[640: 714] = output.to_bytes(74, byteorder='big', signed=False)
     
-    return all
+    return out[0: 714]
 
 def readNibbleDateString(nibbleQueue):
     m = nibbleQueue.pop(0)
@@ -168,7 +225,106 @@ def readString(data, index):
         value += chr(currentByte)
         
     return value, index, delimiter
+
+
+def field_offsets(data, spans=None):
+    """Byte range [start, end) of decrypted data that each field is read from
+
+    Walks the data the same way parse_data does, so names and ID numbers
+    containing the 0x57 image marker are skipped correctly. Nibble fields
+    that start or end mid-byte include the whole byte. Besides the
+    DrivingLicense fields there are spans for the sections: preamble, marker
+    (0x82 and its length byte), strings, binary (ID number type and nibbles),
+    image_header, image_width, image_height and image.
+
+    Args:
+        data (bytes-like): decrypted data
+        spans (dict): filled in as fields are read, so a caller catching the
+            error keeps the fields before the point parsing failed
+
+    Returns:
+        dict: name -> (start, end)
+
+    Raises:
+        IndexError: the data ends before the image section
+    """
+    spans = {} if spans is None else spans
+    index = 0
+    for i in range(len(data)):
+        if data[i] == 0x82:
+            index = i
+            break
+    spans['preamble'] = (0, index)
+    spans['marker'] = (index, index + 2)
+    index += 2
+    strings_start = index
+
+    def strings(name, count):
+        nonlocal index
+        start = index
+        values, index = readStrings(data, index, count)
+        spans[name] = (start, index)
+
+    def string(name):
+        nonlocal index
+        start = index
+        value, index, delimiter = readString(data, index)
+        spans[name] = (start, index)
+        return delimiter
+
+    strings('vehicleCodes', 4)
+    string('surname')
+    if string('initials') == 0xe0:
+        string('PrDPCode')
+    else:
+        spans['PrDPCode'] = (index, index)
+    string('idCountryOfIssue')
+    string('licenseCountryOfIssue')
+    strings('vehicleRestrictions', 4)
+    string('licenseNumber')
+    spans['idNumber'] = (index, index + 13)
+    index += 13
+    spans['strings'] = (strings_start, index)
+    spans['idNumberType'] = (index, index + 1)
+    index += 1
+
+    section = index
+    end = bytes(data[section:]).find(0x57)
+    if end == -1:
+        raise IndexError('no image section')
+    end += section
+    spans['binary'] = (section - 1, end)
+    position = 0
+
+    def nibbles(name, count):
+        nonlocal position
+        spans[name] = (section + position // 2, section + (position + count + 1) // 2)
+        position += count
+
+    def date(name):
+        byte = data[section + position // 2]
+        empty = (byte >> 4 if position % 2 == 0 else byte & 0x0f) == 10
+        nibbles(name, 1 if empty else 8)
+
+    first = position
+    for i in range(4):
+        date('licenseCodeIssueDates')
+    spans['licenseCodeIssueDates'] = (section + first // 2, spans['licenseCodeIssueDates'][1])
+    nibbles('driverRestrictionCodes', 2)
+    date('PrDPermitExpiryDate')
+    nibbles('licenseIssueNumber', 2)
+    date('birthdate')
+    date('licenseIssueDate')
+    date('licenseExpiryDate')
+    nibbles('gender', 2)
+
+    spans['image_header'] = (end, end + 7)
+    spans['image_width'] = (end + 4, end + 5)
+    spans['image_height'] = (end + 6, end + 7)
+    spans['image'] = (end + 7, len(data))
+    return spans
  
+@metrics.timed('parse_data')
 def parse_data(data):
     """Parse data
 
@@ -315,12 +471,7 @@ def parse_base64(base64_string, encrypted=False):
         Driving license object
     """
     data = base64.b64decode(base64_string)
-    if len(data) != 720 and encrypted == True:
-        return None
-    
-    if encrypted:
-        data = decrypt_data(data)
-    return parse_data(data)
+    return parse_bytes(data, encrypted)
 
 def parse_bytes(bytes, encrypted=False):
     """Parse bytes
@@ -332,14 +483,27 @@ def parse_bytes(bytes, encrypted=False):
     Returns: 
         Driving license object
     """
-    data = bytes
-    if len(data) != 720 and encrypted == True:
+    return _parse_payload(bytes, encrypted)
+
+def _parse_payload(data, encrypted, decrypt=decrypt_data):
+    # Checks, decryption and parsing shared by parse_bytes and sadl.aio, which
+    # passes a decrypt that hands the RSA work to its process pool. Unknown
+    # headers are still decrypted; decrypt_data reports them.
+    result = triage([data], encrypted)[0]
+    if result.reason in ('bad_encoding', 'bad_length'):
+        metrics.failure(result.reason)
         return None
-    
+
+    data = result.data
     if encrypted:
-        # print(len(bytes))
-        data = decrypt_data(bytes)
-    return parse_data(data)
+        data = decrypt(data)
+    try:
+        dl = parse_data(data)
+    except Exception:
+        metrics.failure('parse_error')
+        raise
+    metrics.success('parse')
+    return dl
 
 def parse_file(filename, encrypted=True, license=''):
     """Parse file
@@ -351,9 +515,92 @@ def parse_file(filename, encrypted=True, license=''):
     Returns: 
         Driving license object
     """
-    
+    return _parse_file(filename, encrypted, license)
+
+def _parse_file(filename, encrypted, license, decrypt=decrypt_data):
+    # parse_file for sadl.aio too; see _parse_payload
     data = decode_pdf417(filename, license)
-    if data == None or len(data) != 720:
+    if data == None:
+        metrics.failure('no_barcode')
+        return None
+    if len(data) != 720:
+        metrics.failure('bad_length')
         return None
     
-    return parse_bytes(data, encrypted)
+    return _parse_payload(data, encrypted, decrypt)
+
+_headers = {bytes(v1): 'v1', bytes(v2): 'v2'}
+_hex_digits = frozenset(b'0123456789abcdefABCDEF')
+
+
+class TriageResult:
+    """Outcome of triage() for one payload
+
+    Attributes:
+        data (bytes): decoded payload, None if the text could not be decoded
+        encoding (str): 'raw', 'hex' or 'base64'
+        version (str): 'v1' or 'v2' for a known encrypted header, else None
+        reason (str): None if the payload is worth parsing, else 'bad_encoding',
+            'bad_length' or 'unknown_header'
+    """
+
+    __slots__ = ('data', 'encoding', 'version', 'reason')
+
+    def __init__(self, data, encoding, version, reason):
+        self.data = data
+        self.encoding = encoding
+        self.version = version
+        self.reason = reason
+
+    @property
+    def ok(self):
+        return self.reason is None
+
+    def __repr__(self):
+        return f'TriageResult(encoding={self.encoding!r}, version={self.version!r}, length={len(self.data) if self.data is not None else None}, reason={self.reason!r})'
+
+
+def _decode_text(text):
+    if isinstance(text, str):
+        text = text.encode('ascii', 'replace')
+    text = b''.join(bytes(text).split())
+    if len(text) % 2 == 0 and _hex_digits.issuperset(text):
+        return bytes.fromhex(text.decode('ascii')), 'hex'
+    try:
+        return base64.b64decode(text, validate=True), 'base64'
+    except ValueError:
+        return None, 'base64'
+
+
+def triage(payloads, encrypted=True):
+    """Classify payloads from their header and length, without decrypting
+
+    Text is decoded as hex or base64. Encrypted payloads must be 720 bytes
+    and start with the v1 or v2 header; anything else would only produce
+    garbage after six RSA operations. Unencrypted payloads are only checked
+    for a valid encoding.
+
+    Args:
+        payloads (iterable): raw bytes-like payloads, or hex/base64 text as str
+        encrypted (bool): are the payloads encrypted
+
+    Returns:
+        list: a TriageResult per payload, in input order
+    """
+    results = []
+    for payload in payloads:
+        if isinstance(payload, str):
+            data, encoding = _decode_text(payload)
+        else:
+            data, encoding = payload, 'raw'
+
+        if data is None:
+            results.append(TriageResult(None, encoding, None, 'bad_encoding'))
+        elif not encrypted:
+            results.append(TriageResult(data, encoding, None, None))
+        elif len(data) != 720:
+            results.append(TriageResult(data, encoding, None, 'bad_length'))
+        else:
+            version = _headers.get(bytes(data[0: 4]))
+            results.append(TriageResult(data, encoding, version, None if version else 'unknown_header'))
+    return results
@@ -0,0 +1,151 @@
+import asyncio
+import base64
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+from . import _parse_file, _parse_payload, decrypt_data
+
+
+class AsyncParser:
+    """Parse driving licenses from asyncio code without blocking the event loop
+
+    Requests run the same checks, metrics and parsing as the sync functions
+    on a thread pool; PDF417 decoding there releases the GIL, and RSA
+    decryption is handed on to a process pool. At most `max_concurrency` requests are
+    in flight at once; the rest wait their turn.
+
+    Cancelling a request or hitting its timeout releases its slot immediately,
+    but a job already handed to a pool runs to completion in the background.
+
+    Args:
+        max_concurrency (int): maximum number of requests in flight
+        thread_workers (int): size of the barcode decoding thread pool
+        process_workers (int): size of the decryption process pool
+    """
+
+    def __init__(self, max_concurrency=4, thread_workers=None, process_workers=None):
+        self.max_concurrency = max_concurrency
+        self._threads = ThreadPoolExecutor(thread_workers or max_concurrency)
+        self._processes = ProcessPoolExecutor(process_workers)
+        self._semaphore = None
+        self._loop = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """Shut down the worker pools"""
+        self._threads.shutdown(wait=False)
+        self._processes.shutdown(wait=False)
+
+    def _get_semaphore(self):
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._loop = loop
+        return self._semaphore
+
+    async def _limited(self, coro):
+        async with self._get_semaphore():
+            return await coro
+
+    def _run(self, coro, timeout):
+        return asyncio.wait_for(self._limited(coro), timeout)
+
+    def _decrypt(self, data):
+        # Called on a pool thread, which waits while a process does the RSA work
+        return self._processes.submit(decrypt_data, data).result()
+
+    async def _parse(self, data, encrypted):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._threads, _parse_payload, data, encrypted, self._decrypt)
+
+    async def _parse_file(self, filename, encrypted, license):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._threads, _parse_file, filename, encrypted, license, self._decrypt)
+
+    async def parse_base64(self, base64_string, encrypted=False, timeout=None):
+        """Parse base64 string
+
+        Args:
+            base64_string (str): base64 string
+            encrypted (bool): is the base64 string encrypted
+            timeout (float): seconds to wait before raising asyncio.TimeoutError
+
+        Returns:
+            Driving license object
+        """
+        data = base64.b64decode(base64_string)
+        return await self._run(self._parse(data, encrypted), timeout)
+
+    async def parse_bytes(self, bytes, encrypted=False, timeout=None):
+        """Parse bytes
+
+        Args:
+            bytes (bytes): bytes
+            encrypted (bool): is the bytes encrypted
+            timeout (float): seconds to wait before raising asyncio.TimeoutError
+
+        Returns:
+            Driving license object
+        """
+        return await self._run(self._parse(bytes, encrypted), timeout)
+
+    async def parse_file(self, filename, encrypted=True, license='', timeout=None):
+        """Parse file
+
+        Args:
+            filename (str): filename
+            encrypted (bool): is PDF417 content encrypted
+            license (str): Dynamsoft Barcode Reader license key
+            timeout (float): seconds to wait before raising asyncio.TimeoutError
+
+        Returns:
+            Driving license object
+        """
+        return await self._run(self._parse_file(filename, encrypted, license), timeout)
+
+
+_default_parser = None
+
+
+def configure(max_concurrency=4, thread_workers=None, process_workers=None):
+    """Replace the parser used by the module-level *_async functions
+
+    Args:
+        max_concurrency (int): maximum number of requests in flight
+        thread_workers (int): size of the barcode decoding thread pool
+        process_workers (int): size of the decryption process pool
+
+    Returns:
+        AsyncParser: the new default parser
+    """
+    global _default_parser
+    if _default_parser is not None:
+        _default_parser.close()
+    _default_parser = AsyncParser(max_concurrency, thread_workers, process_workers)
+    return _default_parser
+
+
+def get_parser():
+    """Return the default parser, creating it on first use"""
+    if _default_parser is None:
+        configure()
+    return _default_parser
+
+
+async def parse_base64_async(base64_string, encrypted=False, timeout=None):
+    """Asynchronous version of sadl.parse_base64"""
+    return await get_parser().parse_base64(base64_string, encrypted, timeout)
+
+
+async def parse_bytes_async(bytes, encrypted=False, timeout=None):
+    """Asynchronous version of sadl.parse_bytes"""
+    return await get_parser().parse_bytes(bytes, encrypted, timeout)
+
+
+async def parse_file_async(filename, encrypted=True, license='', timeout=None):
+    """Asynchronous version of sadl.parse_file"""
+    return await get_parser().parse_file(filename, encrypted, license, timeout)
@@ -0,0 +1,108 @@
+import functools
+
+import numpy as np
+
+
+class ByteStats:
+    """Byte statistics of a buffer, computed in one vectorized pass
+
+    Attributes:
+        values (numpy.ndarray): the bytes as a read-only uint8 array
+        size (int): number of bytes
+        histogram (numpy.ndarray): read-only count of each byte value
+        unique (int): number of distinct byte values
+        minimum (int): smallest byte value, or None if empty
+        maximum (int): largest byte value, or None if empty
+        entropy (float): Shannon entropy in bits per byte, 0 to 8
+        zeros (int): number of 0x00 bytes
+        printable (int): number of printable ASCII bytes, 0x20 to 0x7e
+        text (int): printable bytes plus tab, line feed and carriage return
+        repeats (int): positions where three consecutive bytes are equal
+        smooth (int): positions where three consecutive bytes step by at most 2
+        run_starts (numpy.ndarray): offset of each run of equal bytes
+        run_lengths (numpy.ndarray): length of each run of equal bytes
+    """
+    __slots__ = ('values', 'size', 'histogram', 'unique', 'minimum', 'maximum', 'entropy', 'zeros',
+                 'printable', 'text', 'repeats', 'smooth', 'run_starts', 'run_lengths', '_diffs')
+
+    def __init__(self, data):
+        values = np.frombuffer(bytes(data), dtype=np.uint8)
+        self.values = values
+        self.size = len(values)
+
+        histogram = np.bincount(values, minlength=256)
+        histogram.flags.writeable = False
+        self.histogram = histogram
+        present = np.flatnonzero(histogram)
+        self.unique = len(present)
+        self.minimum = int(present[0]) if self.size else None
+        self.maximum = int(present[-1]) if self.size else None
+        p = histogram[present] / max(self.size, 1)
+        self.entropy = float(np.dot(p, np.log2(1 / p)))
+        self.zeros = int(histogram[0])
+        self.printable = int(histogram[0x20:0x7f].sum())
+        self.text = self.printable + int(histogram[[0x09, 0x0a, 0x0d]].sum())
+
+        diffs = np.diff(values.astype(np.int16))
+        diffs.flags.writeable = False
+        self._diffs = diffs
+        same = diffs == 0
+        near = np.abs(diffs) <= 2
+        self.repeats = int(np.count_nonzero(same[:-1] & same[1:]))
+        self.smooth = int(np.count_nonzero(near[:-1] & near[1:]))
+        self.run_starts = np.concatenate(([0], np.flatnonzero(diffs) + 1)) if self.size else np.zeros(0, dtype=np.intp)
+        self.run_lengths = np.diff(np.append(self.run_starts, self.size))
+
+    @property
+    def zero_ratio(self):
+        return self.zeros / self.size if self.size else 0.0
+
+    @property
+    def printable_ratio(self):
+        return self.printable / self.size if self.size else 0.0
+
+    @property
+    def text_ratio(self):
+        return self.text / self.size if self.size else 0.0
+
+    def most_common(self, n=None):
+        """(value, count) pairs, most frequent first, like collections.Counter.most_common
+
+        Ties are ordered by first occurrence.
+        """
+        present, first = np.unique(self.values, return_index=True)
+        order = np.lexsort((first, -self.histogram[present]))[:n]
+        return [(int(present[i]), int(self.histogram[present[i]])) for i in order]
+
+    def progressions(self, step, min_length=3):
+        """Runs of bytes that each differ from the previous one by step
+
+        Returns:
+            list: (offset, length) of every run at least min_length bytes long
+        """
+        matches = np.concatenate(([0], (self._diffs == step).view(np.int8), [0]))
+        edges = np.diff(matches)
+        starts = np.flatnonzero(edges == 1)
+        lengths = np.flatnonzero(edges == -1) - starts + 1
+        keep = lengths >= min_length
+        return list(zip(starts[keep].tolist(), lengths[keep].tolist()))
+
+    def __repr__(self):
+        return f'ByteStats(size={self.size}, unique={self.unique}, entropy={self.entropy:.2f})'
+
+
+@functools.lru_cache(maxsize=64)
+def _cached(data):
+    return ByteStats(data)
+
+
+def byte_stats(data):
+    """ByteStats of data, cached by content so analyzers can share one computation
+
+    Args:
+        data (bytes-like): buffer to analyze
+
+    Returns:
+        ByteStats: shared instance; do not modify its arrays
+    """
+    return _cached(bytes(data))
@@ -0,0 +1,72 @@
+import numpy as np
+
+from .bytestats import byte_stats
+from .image import extract_image, sniff_format
+
+# Largest run length counted as an RLE count byte; stays below the printable range
+RLE_MAX_COUNT = 31
+
+
+def features(data):
+    """Byte statistics used by classify()
+
+    Args:
+        data (bytes-like): image section
+
+    Returns:
+        dict: histogram (256 counts), entropy (0 to 1, of 8 bits), printable
+        (share of text bytes), extremes (share of 0x00 and 0xff), count_like
+        (share of bytes 1..RLE_MAX_COUNT at the even or odd offsets, whichever
+        is higher) and magic (format of a complete embedded JPEG, PNG or BMP,
+        or None)
+    """
+    stats = byte_stats(data)
+    size = max(stats.size, 1)
+    # The odd offsets are what the histogram has beyond the even ones
+    even = np.bincount(stats.values[0::2], minlength=256)
+    odd = stats.histogram - even
+    counts = slice(1, RLE_MAX_COUNT + 1)
+    count_like = max(even[counts].sum() / max(even.sum(), 1), odd[counts].sum() / max(odd.sum(), 1))
+    image, magic = extract_image(data)
+
+    return {
+        'histogram': stats.histogram,
+        'entropy': stats.entropy / 8,
+        'printable': stats.text_ratio,
+        'extremes': float((stats.histogram[0] + stats.histogram[255]) / size),
+        'count_like': float(count_like),
+        'magic': None if magic == 'raw' else magic,
+    }
+
+
+def _above(value, baseline):
+    # How far value is above what uniformly random bytes would give, 0 to 1
+    return min(max((value - baseline) / (1 - baseline), 0.0), 1.0)
+
+
+def classify(data):
+    """Rank the likely formats of an image section
+
+    'jpeg', 'png' and 'bmp' are certain when the data starts with the
+    signature and likely when a complete image is embedded. 'text' grows with
+    the share of printable bytes, 'packed' (1-bit bitmaps) with the share of
+    0x00 and 0xff, and 'rle' with small count bytes at alternating offsets,
+    each measured against uniformly random bytes. 'raw' is what is left: no
+    format stands out, so every decoder is worth trying.
+
+    Args:
+        data (bytes-like): image section
+
+    Returns:
+        list: (format, confidence) pairs, best first; confidence is 0 to 1
+    """
+    stats = features(data)
+    head = sniff_format(data)
+    scores = {}
+    for name in ('jpeg', 'png', 'bmp'):
+        scores[name] = 1.0 if head == name else 0.9 if stats['magic'] == name else 0.0
+    scores['text'] = _above(stats['printable'], 98 / 256)
+    scores['packed'] = _above(stats['extremes'], 2 / 256)
+    scores['rle'] = _above(stats['count_like'], RLE_MAX_COUNT / 256)
+    scores['raw'] = 1 - max(scores.values())
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
@@ -0,0 +1,267 @@
+import base64
+import os
+import socket
+import socketserver
+import stat
+import struct
+import threading
+
+from . import default_license, load_public_key, metrics, parse_bytes, pk_v1_128, pk_v1_74, pk_v2_128, pk_v2_74, triage
+
+# Every message is a 4-byte big-endian length followed by the body.
+#
+# Request body:  types (1 byte) | encrypted (1 byte) | license length (2 bytes) | license | source
+#   types 1: source is an image path readable by the daemon
+#   types 2: source is the base64 text
+#   types 3: source is the raw bytes
+#
+# Response body: status (1 byte, 0 = ok) | UTF-8 text printed by sadltool
+_LENGTH = struct.Struct('>I')
+_HEADER = struct.Struct('>BBH')
+
+# Largest message body accepted; requests carry a path or one payload
+MAX_MESSAGE_SIZE = 1 << 20
+
+STATUS_OK = 0
+STATUS_ERROR = 1
+
+
+def _recv_exactly(sock, size):
+    data = bytearray()
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            return None
+        data += chunk
+    return bytes(data)
+
+
+def recv_message(sock):
+    """Read one length-prefixed message, or None if the peer closed the connection
+
+    Raises:
+        ValueError: the announced length is over MAX_MESSAGE_SIZE; the body
+            is left unread, so the connection cannot be used any further
+    """
+    header = _recv_exactly(sock, _LENGTH.size)
+    if header is None:
+        return None
+    (size,) = _LENGTH.unpack(header)
+    if size > MAX_MESSAGE_SIZE:
+        raise ValueError(f'Message of {size} bytes is over the {MAX_MESSAGE_SIZE} byte limit')
+    return _recv_exactly(sock, size)
+
+
+def send_message(sock, body):
+    """Write one length-prefixed message"""
+    sock.sendall(_LENGTH.pack(len(body)) + body)
+
+
+def encode_request(types, encrypted, license, source):
+    license = license.encode('utf-8')
+    return _HEADER.pack(types, int(encrypted), len(license)) + license + source
+
+
+def decode_request(body):
+    types, encrypted, size = _HEADER.unpack_from(body)
+    start = _HEADER.size
+    license = body[start: start + size].decode('utf-8')
+    return types, bool(encrypted), license, body[start + size:]
+
+
+class _Readers(threading.local):
+    reader = None
+
+
+class Worker:
+    """Warm state shared by all connections: parsed keys and per-thread barcode readers
+
+    Args:
+        license (str): Dynamsoft Barcode Reader license key
+    """
+
+    def __init__(self, license=''):
+        self.license = license or default_license
+        self._lock = threading.Lock()
+        self._initialized = None
+        self._readers = _Readers()
+        for pem in (pk_v1_128, pk_v1_74, pk_v2_128, pk_v2_74):
+            load_public_key(pem)
+
+    def _reader(self, license):
+        from dbr import BarcodeReader
+
+        license = license or self.license
+        with self._lock:
+            if self._initialized != license:
+                BarcodeReader.init_license(license)
+                self._initialized = license
+                self._readers = _Readers()
+        if self._readers.reader is None:
+            self._readers.reader = BarcodeReader()
+        return self._readers.reader
+
+    @metrics.timed('decode_pdf417')
+    def decode_pdf417(self, image_file, license=''):
+        """Same as sadl.decode_pdf417, reusing a warm reader"""
+        results = self._reader(license).decode_file(image_file)
+        if results != None and len(results) > 0:
+            return results[0].barcode_bytes
+        else:
+            return None
+
+    @metrics.timed('decode_pdf417')
+    def decode_pdf417_bytes(self, image_bytes, license=''):
+        """Same as decode_pdf417 for the content of an image file"""
+        results = self._reader(license).decode_file_stream(image_bytes)
+        if results != None and len(results) > 0:
+            return results[0].barcode_bytes
+        else:
+            return None
+
+    def parse_image(self, image_bytes, encrypted=True, license=''):
+        """Parse a PDF417 image held in memory
+
+        Args:
+            image_bytes (bytes): content of an image file
+            encrypted (bool): is PDF417 content encrypted
+            license (str): Dynamsoft Barcode Reader license key
+
+        Returns:
+            Driving license object
+        """
+        data = self.decode_pdf417_bytes(image_bytes, license)
+        if data == None or len(data) != 720:
+            return None
+        return parse_bytes(data, encrypted)
+
+    def parse(self, types, encrypted, license, source):
+        """Parse a source the same way sadltool does
+
+        Returns:
+            Driving license object
+        """
+        if types == 1:
+            data = self.decode_pdf417(source.decode('utf-8'), license)
+            if data == None or len(data) != 720:
+                return None
+            return parse_bytes(data, encrypted)
+        elif types == 2 or types == 3:
+            data = base64.b64decode(source.decode('utf-8')) if types == 2 else source
+            result = triage([data], encrypted)[0]
+            if not result.ok:
+                raise ValueError(f'Not a driving license payload: {result.reason}')
+            return parse_bytes(data, encrypted)
+        raise ValueError(f'Unknown source type: {types}')
+
+    def handle(self, body):
+        """Turn a request body into a response body"""
+        try:
+            dl = self.parse(*decode_request(body))
+            return bytes([STATUS_OK]) + str(dl).encode('utf-8')
+        except Exception as err:
+            return bytes([STATUS_ERROR]) + str(err).encode('utf-8')
+
+
+class _Handler(socketserver.BaseRequestHandler):
+    def handle(self):
+        while True:
+            try:
+                body = recv_message(self.request)
+            except ValueError as err:
+                send_message(self.request, bytes([STATUS_ERROR]) + str(err).encode('utf-8'))
+                break
+            if body is None:
+                break
+            send_message(self.request, self.server.worker.handle(body))
+
+
+class Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Unix domain socket server answering sadltool requests on a warm Worker
+
+    Each client connection gets its own thread and may send any number of
+    requests. The socket is only accessible to the daemon's user. A socket
+    left at path by an earlier daemon is replaced; any other file there
+    raises FileExistsError.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, path, license=''):
+        if _is_socket(path):
+            # Left behind by a daemon that did not shut down cleanly
+            os.unlink(path)
+        elif os.path.lexists(path):
+            raise FileExistsError(f'{path} exists and is not a socket')
+        self.worker = Worker(license)
+        super().__init__(path, _Handler)
+
+    def server_bind(self):
+        super().server_bind()
+        # Only the daemon's user may connect: requests read files as that user
+        os.chmod(self.server_address, 0o600)
+
+    def server_close(self):
+        super().server_close()
+        if _is_socket(self.server_address):
+            os.unlink(self.server_address)
+
+
+def _is_socket(path):
+    try:
+        return stat.S_ISSOCK(os.lstat(path).st_mode)
+    except FileNotFoundError:
+        return False
+
+
+def serve(path, license=''):
+    """Run the daemon until interrupted
+
+    Args:
+        path (str): Unix domain socket path
+        license (str): Dynamsoft Barcode Reader license key
+    """
+    with Server(path, license) as server:
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+
+
+class Client:
+    """Thin client that forwards requests to a running daemon
+
+    Args:
+        path (str): Unix domain socket path
+    """
+
+    def __init__(self, path):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.sock.close()
+
+    def request(self, types, encrypted, license, source):
+        """Send one request
+
+        Args:
+            types (int): 1: PDF417 image path 2: Base64 string 3: Raw bytes
+            encrypted (bool): is the source encrypted
+            license (str): Dynamsoft Barcode Reader license key
+            source (bytes): image path, base64 text or raw bytes
+
+        Returns:
+            (bool, str): success flag and the text sadltool would print
+        """
+        send_message(self.sock, encode_request(types, encrypted, license, source))
+        body = recv_message(self.sock)
+        if body is None:
+            raise ConnectionError('Daemon closed the connection')
+        return body[0] == STATUS_OK, body[1:].decode('utf-8')
@@ -0,0 +1,224 @@
+import argparse
+import bisect
+import collections
+import contextlib
+import itertools
+import mmap
+import sys
+
+from . import field_offsets
+from .synth import PAYLOAD_SIZE
+
+# Byte value -> itself if printable ASCII, else '.'
+_PRINTABLE = bytes(b if 0x20 <= b <= 0x7e else 0x2e for b in range(256))
+
+
+def layout(data):
+    """Byte range [start, end) of decrypted data that each field is read from
+
+    See sadl.field_offsets. If parsing fails part way, the fields read so far
+    are returned instead of raising.
+
+    Args:
+        data (bytes-like): decrypted data
+
+    Returns:
+        dict: name -> (start, end)
+    """
+    spans = {}
+    try:
+        field_offsets(data, spans)
+    except IndexError:
+        pass
+    return spans
+
+
+def _starts(spans):
+    # Sorted field start offsets and the names starting at each, enclosing spans first
+    names = {}
+    for name, (start, end) in sorted(spans.items(), key=lambda item: (item[1][0], -item[1][1])):
+        names.setdefault(start, []).append(name)
+    return sorted(names), names
+
+
+def _rows(data, start, end, width, chunk_size):
+    # (offset, row bytes), copying one chunk of whole rows at a time. Slicing
+    # data instead of holding a memoryview lets an mmap close while a dump is
+    # still open.
+    end = len(data) if end is None else min(end, len(data))
+    step = max(width, chunk_size // width * width)
+    for chunk_start in range(start, end, step):
+        chunk = bytes(data[chunk_start: min(chunk_start + step, end)])
+        for i in range(0, len(chunk), width):
+            yield chunk_start + i, chunk[i: i + width]
+
+
+def _hex(row, width, marks=(), missing=0):
+    # Hex bytes and '--' for missing ones, separated by spaces or by the mark before a marked column
+    text = ' '.join(part for part in (row.hex(' '), ' '.join(['--'] * missing)) if part)
+    if marks:
+        chars = list(text)
+        for column, mark in marks:
+            if 0 < column < len(row) + missing:
+                chars[3 * column - 1] = mark
+        text = ''.join(chars)
+    return text.ljust(3 * width - 1)
+
+
+def dump(data, start=0, end=None, width=16, spans=None, origin=0, chunk_size=1 << 16):
+    """Hex dump lines, produced lazily one chunk at a time
+
+    Each line is the offset, the hex bytes, the printable ASCII and the
+    names of the fields starting on the line. A '|' in place of the space
+    before a byte marks where a field starts. Only chunk_size bytes are
+    copied at a time, so data can be an mmap of an archive of any size.
+
+    Args:
+        data (bytes-like): buffer to dump
+        start (int): first offset to dump
+        end (int): offset to stop at, defaults to the end of data
+        width (int): bytes per line
+        spans (dict): name -> (start, end) offsets in data, as from layout()
+        origin (int): added to the offsets shown
+        chunk_size (int): bytes copied per step
+
+    Yields:
+        str: one line per width bytes
+    """
+    offsets, names = _starts(spans or {})
+    for offset, row in _rows(data, start, end, width, chunk_size):
+        first = bisect.bisect_left(offsets, offset)
+        last = bisect.bisect_left(offsets, offset + len(row))
+        starting = offsets[first:last]
+        line = f'{offset + origin:08x}: {_hex(row, width, [(at - offset, "|") for at in starting])}  {row.translate(_PRINTABLE).decode("ascii")}'
+        if starting:
+            line = line.ljust(11 + 4 * width) + '  ' + ', '.join(name for at in starting for name in names[at])
+        yield line
+
+
+def diff(a, b, width=16, spans=None, context=0, origin=0, chunk_size=1 << 16):
+    """Side by side hex dump of the lines where two buffers differ
+
+    A '>' in place of the space before a byte marks a difference; bytes past
+    the end of the shorter buffer show as '--'. Each line ends with the
+    fields the differing bytes belong to. Lines are produced lazily, as in
+    dump().
+
+    Args:
+        a (bytes-like): first buffer, which spans refer to
+        b (bytes-like): second buffer
+        width (int): bytes per line
+        spans (dict): name -> (start, end) offsets in a, as from layout(a)
+        context (int): equal lines to show before and after each difference
+        origin (int): added to the offsets shown
+        chunk_size (int): bytes copied per step
+
+    Yields:
+        str: one line per row shown, and '...' where equal rows are skipped
+    """
+    spans = sorted((spans or {}).items(), key=lambda item: item[1])
+    before = collections.deque(maxlen=context)
+    after = 0
+    shown = None
+    offset = None
+    for row_a, row_b in itertools.zip_longest(_rows(a, 0, None, width, chunk_size), _rows(b, 0, None, width, chunk_size)):
+        offset, left = row_a or (row_b[0], b'')
+        right = row_b[1] if row_b else b''
+        if left == right:
+            if after:
+                after -= 1
+                shown = offset
+                yield _diff_line(offset + origin, left, right, width)
+            else:
+                before.append((offset, left))
+            continue
+
+        first = before[0][0] if before else offset
+        if first > (0 if shown is None else shown + width):
+            yield '...'
+        for previous, row in before:
+            yield _diff_line(previous + origin, row, row, width)
+        before.clear()
+        columns = [i for i in range(max(len(left), len(right))) if left[i: i + 1] != right[i: i + 1]]
+        fields = [name for name, (start, end) in spans if any(start <= offset + i < end for i in columns)]
+        yield _diff_line(offset + origin, left, right, width, columns, fields)
+        shown = offset
+        after = context
+    if shown is not None and offset > shown:
+        yield '...'
+
+
+def _diff_line(offset, left, right, width, columns=(), fields=()):
+    marks = [(column, '>') for column in columns]
+    size = max(len(left), len(right))
+    line = f'{offset:08x}: {_hex(left, width, marks, size - len(left))}  |  {_hex(right, width, marks, size - len(right))}'
+    if fields:
+        line += '  ' + ', '.join(fields)
+    return line.rstrip()
+
+
+@contextlib.contextmanager
+def open_archive(path):
+    """Map a file read-only, for dump() and records() without reading it into memory
+
+    Args:
+        path (str): file to map
+
+    Yields:
+        mmap.mmap or bytes: the mapped file, or b'' if it is empty
+    """
+    with open(path, 'rb') as f:
+        if not f.seek(0, 2):
+            yield b''
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            yield mapped
+
+
+def records(data, size=PAYLOAD_SIZE):
+    """(offset, record) for back-to-back records, such as python -m sadl.synth output
+
+    Args:
+        data (bytes-like): archive
+        size (int): record size
+
+    Yields:
+        (int, bytes): offset and content of the record
+    """
+    for offset in range(0, len(data), size):
+        yield offset, bytes(data[offset: offset + size])
+
+
+def main():
+    parser = argparse.ArgumentParser(prog='python -m sadl.hexdump', description='Hex dump decrypted driving license payloads with field boundaries.')
+    parser.add_argument('file', help=f'Decrypted payload, or an archive of back-to-back {PAYLOAD_SIZE}-byte records')
+    parser.add_argument('-r', '--record', type=int, action='append', help='Only dump this record number (repeatable)')
+    parser.add_argument('-d', '--diff', help='Show the lines where this file differs, side by side')
+    parser.add_argument('-c', '--context', default=0, type=int, help='Equal lines to show around each difference')
+    parser.add_argument('-w', '--width', default=16, type=int, help='Bytes per line')
+    args = parser.parse_args()
+
+    with contextlib.ExitStack() as stack:
+        data = stack.enter_context(open_archive(args.file))
+        other = stack.enter_context(open_archive(args.diff)) if args.diff else None
+        items = records(data)
+        others = records(other) if other is not None else None
+        for number, (offset, record) in enumerate(items):
+            other_record = next(others, (offset, b''))[1] if others is not None else None
+            if args.record and number not in args.record:
+                continue
+            print(f'record {number} at {offset:#x}')
+            spans = layout(record)
+            if other_record is None:
+                lines = dump(record, width=args.width, spans=spans, origin=offset)
+            else:
+                lines = diff(record, other_record, width=args.width, spans=spans, context=args.context, origin=offset)
+            for line in lines:
+                print(line)
+        if others is not None:
+            for offset, record in others:
+                print(f'record at {offset:#x} only in {args.diff}')
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,233 @@
+import base64
+import json
+import multiprocessing
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from . import parse_bytes, triage
+from .daemon import Worker
+from .metrics import Counter, Histogram, render
+
+_worker = None
+
+# Largest request body accepted; enough for a photo of a card or a large batch
+MAX_BODY_SIZE = 16 << 20
+
+
+def _init_worker(license):
+    global _worker
+    _worker = Worker(license)
+    try:
+        _worker._reader('')
+    except Exception:
+        # Image requests will report the error; payload requests still work
+        pass
+
+
+def license_to_dict(dl):
+    """Convert a driving license object into a JSON serializable dict"""
+    if dl is None:
+        return None
+    return dict(vars(dl))
+
+
+def decode_item(kind, data, encrypted=True, license=''):
+    """Decode one item inside a pool worker
+
+    Args:
+        kind (str): 'image', 'base64', 'hex' or 'raw'
+        data (str or bytes): base64 encoded image file, base64 text, hex text or raw bytes
+        encrypted (bool): is the payload encrypted
+        license (str): Dynamsoft Barcode Reader license key
+
+    Returns:
+        dict: {'license': ...} on success, {'error': ...} otherwise
+    """
+    try:
+        if kind == 'image':
+            if isinstance(data, str):
+                data = base64.b64decode(data)
+            dl = _worker.parse_image(data, encrypted, license)
+        elif kind in ('base64', 'hex', 'raw'):
+            if kind == 'hex':
+                data = bytes.fromhex(data)
+            elif isinstance(data, str):
+                data = base64.b64decode(data)
+            result = triage([data], encrypted)[0]
+            if not result.ok:
+                # Skip the RSA work for payloads that cannot be licenses
+                return {'error': f'Rejected: {result.reason}'}
+            dl = parse_bytes(data, encrypted)
+        else:
+            return {'error': f'Unknown type: {kind}'}
+    except Exception as err:
+        return {'error': str(err)}
+
+    if dl is None:
+        return {'error': 'No driving license found'}
+    return {'license': license_to_dict(dl)}
+
+
+def _parse_flag(value):
+    # 'encrypted' from JSON or a query string: false, 0, '0', 'false', 'no'
+    # and 'off' are False, anything else is True
+    return str(value).strip().lower() not in ('0', 'false', 'no', 'off')
+
+
+def _decode_request(request):
+    if not isinstance(request, dict):
+        return {'error': 'Each item must be a JSON object'}
+    return decode_item(request.get('type', 'base64'), request.get('data', ''),
+                       _parse_flag(request.get('encrypted', True)), request.get('license', ''))
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        if not self.server.quiet:
+            super().log_message(format, *args)
+
+    def _send(self, status, body, content_type='application/json'):
+        if not isinstance(body, bytes):
+            body = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_body(self):
+        # (body, None), or (None, (status, error)) without reading anything
+        try:
+            size = int(self.headers.get('Content-Length', 0))
+        except ValueError:
+            size = -1
+        if size < 0:
+            return None, (400, {'error': 'Invalid Content-Length'})
+        if size > MAX_BODY_SIZE:
+            return None, (413, {'error': f'Body of {size} bytes is over the {MAX_BODY_SIZE} byte limit'})
+        return self.rfile.read(size), None
+
+    def _observe(self, path, status, start):
+        self.server.latency.observe(time.perf_counter() - start, path=path)
+        self.server.requests.inc(path=path, status=status)
+
+    def do_GET(self):
+        start = time.perf_counter()
+        path = urlsplit(self.path).path
+        if path == '/metrics':
+            body = render(self.server.latency, self.server.requests).encode('utf-8')
+            self._send(200, body, 'text/plain; version=0.0.4')
+        elif path == '/health':
+            self._send(200, {'status': 'ok'})
+        else:
+            self._send(404, {'error': 'Not found'})
+            return
+        self._observe(path, 200, start)
+
+    def do_POST(self):
+        start = time.perf_counter()
+        url = urlsplit(self.path)
+        body, error = self._read_body()
+
+        if url.path not in ('/decode', '/decode/batch'):
+            status, result = 404, {'error': 'Not found'}
+        elif error is not None:
+            status, result = error
+        elif url.path == '/decode':
+            status, result = self._decode(body, parse_qs(url.query))
+        else:
+            status, result = self._decode_batch(body)
+        if error is not None:
+            # The unread body cannot be skipped, so the connection is not reused
+            self.close_connection = True
+        if status == 404:
+            self._send(status, result)
+            return
+
+        self._send(status, result)
+        self._observe(url.path, status, start)
+
+    def _decode(self, body, query):
+        content_type = self.headers.get('Content-Type', 'application/json').split(';')[0].strip()
+        pool = self.server.pool
+        if content_type == 'application/json':
+            try:
+                request = json.loads(body)
+            except ValueError as err:
+                return 400, {'error': f'Invalid JSON: {err}'}
+            result = pool.apply(_decode_request, (request,))
+        else:
+            kind = 'image' if content_type.startswith('image/') else 'raw'
+            encrypted = _parse_flag(query.get('encrypted', ['1'])[0])
+            license = query.get('license', [''])[0]
+            result = pool.apply(decode_item, (kind, body, encrypted, license))
+        return (200 if 'license' in result else 422), result
+
+    def _decode_batch(self, body):
+        try:
+            requests = json.loads(body)
+        except ValueError as err:
+            return 400, {'error': f'Invalid JSON: {err}'}
+        if isinstance(requests, dict):
+            requests = requests.get('items')
+        if not isinstance(requests, list):
+            return 400, {'error': 'Expected a JSON array of items'}
+        return 200, {'results': self.server.pool.map(_decode_request, requests)}
+
+
+class Server(ThreadingHTTPServer):
+    """HTTP decoding service backed by a pre-forked pool of warm workers
+
+    Endpoints:
+        POST /decode        one item as JSON {"type", "data", "encrypted", "license"},
+                            or a raw payload (application/octet-stream) or image (image/*) body
+        POST /decode/batch  a JSON array of items
+        GET  /metrics       latency histograms in Prometheus text format
+        GET  /health        liveness probe
+
+    Args:
+        address (tuple): (host, port) to listen on
+        workers (int): number of worker processes
+        license (str): Dynamsoft Barcode Reader license key
+        quiet (bool): do not log every request
+    """
+
+    daemon_threads = True
+
+    def __init__(self, address, workers=None, license='', quiet=False):
+        self.quiet = quiet
+        self.pool = None
+        self.latency = Histogram('sadl_http_request_duration_seconds', 'HTTP request latency in seconds')
+        self.requests = Counter('sadl_http_requests_total', 'HTTP requests by path and status')
+        super().__init__(address, _Handler)
+        # Only fork the workers once the address is bound
+        try:
+            self.pool = multiprocessing.Pool(workers, _init_worker, (license,))
+        except BaseException:
+            super().server_close()
+            raise
+
+    def server_close(self):
+        super().server_close()
+        if self.pool is not None:
+            self.pool.terminate()
+            self.pool.join()
+
+
+def serve(host='127.0.0.1', port=8417, workers=None, license=''):
+    """Run the HTTP service until interrupted
+
+    Args:
+        host (str): interface to bind
+        port (int): TCP port
+        workers (int): number of worker processes
+        license (str): Dynamsoft Barcode Reader license key
+    """
+    with Server((host, port), workers, license) as server:
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
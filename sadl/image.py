@@ -0,0 +1,99 @@
+import struct
+
+from . import field_offsets, metrics
+
+# Header of the image section: 'W' (the 0x57 marker parse_data stops at), 'I',
+# one unknown byte, then big-endian width and height
+IMAGE_HEADER_SIZE = 7
+
+# format, start signature, end signature (None: the length is in the header)
+SIGNATURES = (
+    ('jpeg', b'\xff\xd8\xff', b'\xff\xd9'),
+    ('png', b'\x89PNG\r\n\x1a\n', b'IEND\xaeB`\x82'),
+    ('bmp', b'BM', None),
+)
+
+
+def sniff_format(data):
+    """Detect the format of an image from its first bytes
+
+    Args:
+        data (bytes-like): image data
+
+    Returns:
+        str: 'jpeg', 'png', 'bmp' or 'raw'
+    """
+    head = bytes(data[0: 8])
+    for name, start, end in SIGNATURES:
+        if head.startswith(start):
+            return name
+    return 'raw'
+
+
+def _end(name, data, start, end):
+    # Offset just past the image that begins at start, or -1 if it is truncated
+    if name == 'bmp':
+        if start + 6 > len(data):
+            return -1
+        (size,) = struct.unpack_from('<I', data, start + 2)
+        return start + size if 14 <= size <= len(data) - start else -1
+    found = data.find(end, start + len(end))
+    return -1 if found == -1 else found + len(end)
+
+
+@metrics.timed('extract_image')
+def extract_image(data, offset=0):
+    """Find the image in the image section without copying it
+
+    The section is searched for each signature with bytes.find. An embedded
+    JPEG, PNG or BMP must be complete to be recognized; otherwise everything
+    from offset to the end is returned as 'raw'.
+
+    Args:
+        data (bytes-like): decrypted data
+        offset (int): where the image data starts, i.e. after the image header
+
+    Returns:
+        (memoryview, str): image data as a view into data, and its format
+    """
+    view = memoryview(data).cast('B')
+    # find() needs bytes; the search copy is discarded, the returned view is not a copy
+    haystack = data if isinstance(data, (bytes, bytearray)) else bytes(view)
+    for name, start, end in SIGNATURES:
+        begin = haystack.find(start, offset)
+        if begin != -1:
+            stop = _end(name, haystack, begin, end)
+            if stop != -1:
+                return view[begin: stop], name
+    return view[offset:], 'raw'
+
+
+def image_section(data):
+    """Locate the image section of decrypted data
+
+    The offsets come from sadl.field_offsets, which walks the string section
+    the same way parse_data does because the names and ID number may contain
+    the 0x57 byte that marks the section.
+
+    Args:
+        data (bytes-like): decrypted data
+
+    Returns:
+        (int, int, int): offset of the image data after the header, width and height
+    """
+    spans = field_offsets(data)
+    return spans['image'][0], data[spans['image_width'][0]], data[spans['image_height'][0]]
+
+
+@metrics.timed('find_image')
+def find_image(data):
+    """Locate and extract the image of decrypted data
+
+    Args:
+        data (bytes-like): decrypted data
+
+    Returns:
+        (memoryview, str): image data as a view into data, and its format
+    """
+    offset, width, height = image_section(data)
+    return extract_image(data, offset)
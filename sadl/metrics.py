@@ -0,0 +1,184 @@
+import functools
+import threading
+import time
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{name}="{value}"' for name, value in labels) + '}'
+
+
+class Counter:
+    """Monotonic counter with optional labels, rendered in Prometheus text format
+
+    Args:
+        name (str): metric name
+        help (str): help text
+    """
+
+    def __init__(self, name, help):
+        self.name = name
+        self.help = help
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(tuple(sorted(labels.items())), 0)
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} counter']
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f'{self.name}{_format_labels(key)} {value}')
+        return '\n'.join(lines)
+
+
+class Histogram:
+    """Cumulative histogram with optional labels, rendered in Prometheus text format
+
+    Args:
+        name (str): metric name
+        help (str): help text
+        buckets (tuple): upper bounds of the buckets, in seconds
+    """
+
+    def __init__(self, name, help, buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * len(self.buckets), 0.0, 0]
+            counts = series[0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            series[1] += value
+            series[2] += 1
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            for key, (counts, total, count) in sorted(self._series.items()):
+                cumulative = 0
+                for bound, n in zip(self.buckets, counts):
+                    cumulative += n
+                    lines.append(f'{self.name}_bucket{_format_labels(key + (("le", repr(bound)),))} {cumulative}')
+                lines.append(f'{self.name}_bucket{_format_labels(key + (("le", "+Inf"),))} {count}')
+                lines.append(f'{self.name}_sum{_format_labels(key)} {total}')
+                lines.append(f'{self.name}_count{_format_labels(key)} {count}')
+        return '\n'.join(lines)
+
+
+def render(*metrics):
+    """Render metrics as one Prometheus text exposition"""
+    return '\n'.join(metric.render() for metric in metrics) + '\n'
+
+
+_sink = None
+
+
+def set_sink(sink):
+    """Install the instrumentation callback, or None to turn instrumentation off
+
+    The sink is called as sink(event, name, value) with:
+        'start', stage, None         a stage is about to run
+        'end', stage, seconds        a stage returned or raised
+        'success', operation, None   a parse produced a driving license
+        'failure', reason, None      'bad_length', 'unknown_header', 'bad_encoding',
+                                     'no_barcode' or 'parse_error'
+
+    Stages are 'decode_pdf417', 'decrypt_data', 'parse_data', 'find_image'
+    and 'extract_image'; find_image includes its extract_image. Events are
+    only seen in the process that installed the sink.
+
+    Args:
+        sink (callable): event callback, e.g. a Recorder
+
+    Returns:
+        callable: the previous sink
+    """
+    global _sink
+    previous = _sink
+    _sink = sink
+    return previous
+
+
+def get_sink():
+    return _sink
+
+
+def timed(stage):
+    """Decorator reporting the duration of each call to the sink
+
+    Without a sink installed the only cost is one extra function call.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            sink = _sink
+            if sink is None:
+                return func(*args, **kwargs)
+            sink('start', stage, None)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                sink('end', stage, time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+def success(operation):
+    if _sink is not None:
+        _sink('success', operation, None)
+
+
+def failure(reason):
+    if _sink is not None:
+        _sink('failure', reason, None)
+
+
+class Recorder:
+    """Sink aggregating events into stage histograms and outcome counters
+
+    Usage:
+        recorder = Recorder()
+        set_sink(recorder)
+        ...
+        print(recorder.render())
+
+    Args:
+        buckets (tuple): histogram bucket bounds, in seconds
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.durations = Histogram('sadl_stage_duration_seconds', 'Time spent in each stage in seconds', buckets)
+        self.results = Counter('sadl_results_total', 'Parse outcomes by result and reason')
+
+    def __call__(self, event, name, value):
+        if event == 'end':
+            self.durations.observe(value, stage=name)
+        elif event == 'success':
+            self.results.inc(result='success', reason='')
+        elif event == 'failure':
+            self.results.inc(result='failure', reason=name)
+
+    def render(self):
+        """Prometheus text exposition of everything recorded so far"""
+        return render(self.durations, self.results)
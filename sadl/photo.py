@@ -0,0 +1,67 @@
+import io
+
+import numpy as np
+
+from . import tournament
+from .classify import classify
+from .image import extract_image, image_section
+from .results import ImageResult
+
+# Decoders tried for each format from sadl.classify; formats not listed try every decoder
+FORMAT_DECODERS = {
+    'packed': ('1bit', '2bit', '4bit'),
+    'rle': tuple(name for name in tournament.DECODERS if name.startswith('rle_')),
+}
+
+
+def _embedded(image, width, height, image_format):
+    from PIL import Image
+
+    img = Image.open(io.BytesIO(image)).convert('L')
+    resized = img.size != (width, height)
+    if resized:
+        img = img.resize((width, height), Image.BILINEAR)
+    return ImageResult('photo', np.asarray(img), format=image_format, method='pillow', exact=not resized)
+
+
+def decode(image, width, height, image_format='raw'):
+    """Decode an image section into a grayscale array
+
+    Embedded JPEG, PNG and BMP images are decoded with Pillow. The 'WI'
+    section of the license has no published specification, so raw data is
+    classified and decoded by the best scoring of the matching
+    sadl.tournament decoders. That is a best guess, not a known decoding:
+    such results have exact set to False and should be treated as
+    experimental.
+
+    Args:
+        image (bytes-like): image data, as returned by sadl.image.extract_image
+        width (int): image width
+        height (int): image height
+        image_format (str): format from sadl.image.extract_image
+
+    Returns:
+        ImageResult: pixels of shape (height, width), with metadata format,
+        method (decoder name), exact and, for raw data, score
+    """
+    if image_format != 'raw':
+        return _embedded(bytes(image), width, height, image_format)
+
+    detected = classify(image)[0][0]
+    names = FORMAT_DECODERS.get(detected, tournament.DECODERS)
+    best = tournament.run(image, width, height, [(name, tournament.DECODERS[name]) for name in names], top=1)[0]
+    return ImageResult('photo', best.pixels, format=detected, method=best.name, exact=False, score=best.score)
+
+
+def decode_photo(data):
+    """Decode the photo of decrypted license data
+
+    Args:
+        data (bytes-like): decrypted data, as passed to sadl.parse_data
+
+    Returns:
+        ImageResult: see decode()
+    """
+    offset, width, height = image_section(data)
+    image, image_format = extract_image(data, offset)
+    return decode(image, width, height, image_format)
@@ -0,0 +1,227 @@
+import os
+import queue
+import threading
+import time
+from pathlib import Path
+
+from . import decode_pdf417, parse_bytes, triage
+from .shm import SharedDecryptor
+
+_DONE = object()
+
+
+class Stage:
+    """One step of the pipeline: a bounded input queue drained by worker threads
+
+    Args:
+        name (str): stage name used in stats
+        workers (int): number of worker threads
+        maxsize (int): capacity of the input queue
+        producers (int): number of upstream producers feeding the queue
+    """
+
+    def __init__(self, name, workers, maxsize, producers):
+        self.name = name
+        self.workers = workers
+        self.queue = queue.Queue(maxsize)
+        self.processed = 0
+        self.failed = 0
+        self.busy_time = 0.0
+        self._producers = producers
+        self._lock = threading.Lock()
+        self._started = None
+
+    def producer_done(self):
+        """Called by each upstream producer once it has put its last item"""
+        with self._lock:
+            self._producers -= 1
+            last = self._producers == 0
+        if last:
+            for i in range(self.workers):
+                self.queue.put(_DONE)
+
+    def record(self, elapsed, ok):
+        with self._lock:
+            self.busy_time += elapsed
+            if ok:
+                self.processed += 1
+            else:
+                self.failed += 1
+
+    def stats(self):
+        """Return queue depth, counters and throughput (items per second)"""
+        elapsed = time.perf_counter() - self._started if self._started else 0.0
+        done = self.processed + self.failed
+        return {
+            'depth': self.queue.qsize(),
+            'workers': self.workers,
+            'processed': self.processed,
+            'failed': self.failed,
+            'busy_time': self.busy_time,
+            'throughput': done / elapsed if elapsed > 0 else 0.0,
+        }
+
+
+class Pipeline:
+    """Staged decode -> decrypt -> parse pipeline with backpressure
+
+    Image paths (str or Path) enter the decode stage, which runs
+    decode_pdf417 on threads. Raw payloads (bytes, bytearray) skip straight to
+    the decrypt stage, which hands RSA work to a process pool through shared
+    memory. Parsing runs on a single thread and delivers each result to the
+    sink. Every stage has a bounded input queue, so a slow stage throttles the
+    ones before it instead of buffering the whole input in memory.
+
+    Args:
+        decode_workers (int): threads for PDF417 decoding
+        decrypt_workers (int): processes for RSA decryption
+        queue_size (int): capacity of each inter-stage queue
+        encrypted (bool): are the PDF417 contents / payloads encrypted
+        license (str): Dynamsoft Barcode Reader license key
+    """
+
+    def __init__(self, decode_workers=2, decrypt_workers=None, queue_size=64, encrypted=True, license=''):
+        self.decode_workers = decode_workers
+        self.decrypt_workers = decrypt_workers or os.cpu_count() or 1
+        self.queue_size = queue_size
+        self.encrypted = encrypted
+        self.license = license
+        self.stages = {}
+        self._stop = threading.Event()
+        self._error = None
+
+    def stats(self):
+        """Return per-stage queue depth, counters and throughput"""
+        return {name: stage.stats() for name, stage in self.stages.items()}
+
+    def run(self, items, sink=None):
+        """Push items through the pipeline
+
+        Args:
+            items (iterable): image paths and/or raw payloads
+            sink (callable): called as sink(index, license) from the parse thread;
+                license is None when the item could not be decoded or parsed.
+                If the sink raises, the pipeline stops taking new items and
+                run() re-raises the exception once the stages have drained.
+
+        Returns:
+            list: results in input order when no sink is given, else None
+        """
+        self._stop.clear()
+        self._error = None
+        decode = Stage('decode', self.decode_workers, self.queue_size, 1)
+        decrypt = Stage('decrypt', self.decrypt_workers, self.queue_size, 1 + self.decode_workers)
+        parse = Stage('parse', 1, self.queue_size, self.decrypt_workers)
+        self.stages = {'decode': decode, 'decrypt': decrypt, 'parse': parse}
+
+        results = None
+        if sink is None:
+            results = {}
+            sink = results.__setitem__
+
+        now = time.perf_counter()
+        for stage in self.stages.values():
+            stage._started = now
+
+        with SharedDecryptor(self.decrypt_workers, self.decrypt_workers * 2) as decryptor:
+            threads = [threading.Thread(target=self._feed, args=(items, decode, decrypt))]
+            threads += [threading.Thread(target=self._decode, args=(decode, decrypt, parse)) for i in range(decode.workers)]
+            threads += [threading.Thread(target=self._decrypt, args=(decryptor, decrypt, parse)) for i in range(decrypt.workers)]
+            threads += [threading.Thread(target=self._parse, args=(parse, sink))]
+            for thread in threads:
+                thread.daemon = True
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        if self._error is not None:
+            raise self._error
+        if results is not None:
+            return [results.get(i) for i in range(len(results))]
+
+    def _feed(self, items, decode, decrypt):
+        try:
+            for index, item in enumerate(items):
+                if self._stop.is_set():
+                    break
+                if isinstance(item, (str, Path)):
+                    decode.queue.put((index, item))
+                else:
+                    decrypt.queue.put((index, item))
+        finally:
+            decode.producer_done()
+            decrypt.producer_done()
+
+    def _decode(self, decode, decrypt, parse):
+        try:
+            while True:
+                item = decode.queue.get()
+                if item is _DONE:
+                    break
+                index, filename = item
+                if self._stop.is_set():
+                    parse.queue.put((index, None))
+                    continue
+                start = time.perf_counter()
+                try:
+                    data = decode_pdf417(str(filename), self.license)
+                except Exception:
+                    data = None
+                ok = data != None and len(data) == 720
+                decode.record(time.perf_counter() - start, ok)
+                if ok:
+                    decrypt.queue.put((index, data))
+                else:
+                    parse.queue.put((index, None))
+        finally:
+            decrypt.producer_done()
+
+    def _decrypt(self, decryptor, decrypt, parse):
+        try:
+            while True:
+                item = decrypt.queue.get()
+                if item is _DONE:
+                    break
+                index, data = item
+                if self._stop.is_set():
+                    parse.queue.put((index, None))
+                    continue
+                if not self.encrypted:
+                    parse.queue.put((index, data))
+                    continue
+                if not triage([data])[0].ok:
+                    decrypt.record(0.0, False)
+                    parse.queue.put((index, None))
+                    continue
+                start = time.perf_counter()
+                try:
+                    data = decryptor.decrypt(data)
+                except Exception:
+                    data = None
+                decrypt.record(time.perf_counter() - start, data is not None)
+                parse.queue.put((index, data))
+        finally:
+            parse.producer_done()
+
+    def _parse(self, parse, sink):
+        while True:
+            item = parse.queue.get()
+            if item is _DONE:
+                break
+            index, data = item
+            if self._stop.is_set():
+                # Keep draining so the upstream stages can finish
+                continue
+            dl = None
+            if data is not None:
+                start = time.perf_counter()
+                try:
+                    dl = parse_bytes(data)
+                except Exception:
+                    dl = None
+                parse.record(time.perf_counter() - start, dl is not None)
+            try:
+                sink(index, dl)
+            except Exception as e:
+                self._error = e
+                self._stop.set()
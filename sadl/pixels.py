@@ -0,0 +1,75 @@
+import numpy as np
+
+
+def _levels(bits, invert):
+    # Gray level for every packed value, scaled to 0..255
+    top = (1 << bits) - 1
+    levels = (np.arange(top + 1, dtype=np.uint16) * 255 // top).astype(np.uint8)
+    return 255 - levels if invert else levels
+
+
+def unpack_pixels(data, bits, width, height, msb_first=True, invert=False, pad=255):
+    """Unpack 1, 2 or 4 bits per pixel into an 8-bit grayscale image
+
+    Pixels are read in row order without row padding. Packed values are scaled
+    to 0..255, so 1-bit pixels become 0 and 255 and 4-bit pixels multiples of 17.
+
+    Args:
+        data (bytes-like): packed pixels
+        bits (int): bits per pixel, 1, 2 or 4
+        width (int): image width
+        height (int): image height
+        msb_first (bool): the first pixel of a byte is in its most significant bits
+        invert (bool): map 0 to white instead of black
+        pad (int): gray level of pixels past the end of data
+
+    Returns:
+        numpy.ndarray: uint8 array of shape (height, width)
+    """
+    if bits not in (1, 2, 4):
+        raise ValueError(f'Unsupported bits per pixel: {bits}')
+
+    count = width * height
+    packed = np.frombuffer(data, dtype=np.uint8)[:(count * bits + 7) // 8]
+    if bits == 1:
+        values = np.unpackbits(packed, bitorder='big' if msb_first else 'little')
+    else:
+        shifts = range(8 - bits, -1, -bits) if msb_first else range(0, 8, bits)
+        mask = (1 << bits) - 1
+        values = np.stack([(packed >> shift) & mask for shift in shifts], axis=1).ravel()
+
+    pixels = np.full(count, pad, dtype=np.uint8)
+    available = min(count, len(values))
+    pixels[:available] = _levels(bits, invert).take(values[:available])
+    return pixels.reshape(height, width)
+
+
+def plot(canvas, x, y, value=0, radius=0):
+    """Draw a filled square around each point, wrapping at the canvas edges
+
+    Overlapping points are drawn in order, so a later point wins.
+
+    Args:
+        canvas (numpy.ndarray): uint8 array of shape (height, width), drawn on in place
+        x (array-like): column of each point, taken modulo the width
+        y (array-like): row of each point, taken modulo the height
+        value (int or array-like): gray level, one for all points or one per point
+        radius (int): half the side of the square; 0 draws single pixels
+
+    Returns:
+        int: number of pixels drawn, counting overlaps
+    """
+    height, width = canvas.shape
+    offsets = np.arange(-radius, radius + 1)
+    x = np.asarray(x, dtype=np.intp)[:, None, None]
+    y = np.asarray(y, dtype=np.intp)[:, None, None]
+    # One row of (2 * radius + 1) ** 2 pixel positions per point, in point order
+    flat = (((y + offsets[:, None]) % height) * width + (x + offsets) % width).ravel()
+    values = np.broadcast_to(np.asarray(value, dtype=np.uint8)[..., None, None], (len(x), len(offsets), len(offsets))).ravel()
+    if values.size and np.ptp(values):
+        # Fancy assignment leaves the winner among repeated positions unspecified; keep the last one
+        _, last = np.unique(flat[::-1], return_index=True)
+        keep = flat.size - 1 - last
+        flat, values = flat[keep], values[keep]
+    canvas.reshape(-1)[flat] = values
+    return int(len(x) * len(offsets) ** 2)
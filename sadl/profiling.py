@@ -0,0 +1,165 @@
+import cProfile
+import fnmatch
+import os
+import pstats
+import re
+import sys
+import tracemalloc
+from collections import defaultdict
+
+from . import metrics
+
+
+def _label(func):
+    filename, line, name = func
+    if filename == '~':
+        return name
+    return f'{name} ({os.path.basename(filename)}:{line})'
+
+
+def collapse_stats(stats, min_seconds=1e-6):
+    """Turn cProfile statistics into collapsed stacks for flame graphs
+
+    cProfile only records caller -> callee edges, so the time of a function
+    that is reached along several paths is split between them in proportion
+    to the time spent on each edge.
+
+    Args:
+        stats (pstats.Stats): profile statistics
+        min_seconds (float): drop stacks cheaper than this
+
+    Returns:
+        dict: 'frame;frame;frame' -> self time in seconds
+    """
+    raw = stats.stats
+    # Everything the walk needs per function, computed once rather than on
+    # every path through it: label, self time per cumulative second and
+    # (callee, share of the cumulative time spent in it) edges
+    labels = {}
+    ratios = {}
+    callees = defaultdict(list)
+    for func, (cc, nc, tt, ct, callers) in raw.items():
+        labels[func] = _label(func)
+        ratios[func] = tt / ct if ct > 0 else None
+        for caller, edge in callers.items():
+            caller_ct = raw[caller][3] if caller in raw else 0
+            if caller_ct > 0:
+                callees[caller].append((func, edge[3] / caller_ct))
+
+    stacks = defaultdict(float)
+
+    def walk(func, prefix, seen, share):
+        ratio = ratios[func]
+        if ratio is None or share < min_seconds:
+            return
+        stack = prefix + labels[func]
+        stacks[stack] += share * ratio
+        seen = seen | {func}
+        stack += ';'
+        for callee, edge_ratio in callees[func]:
+            if callee not in seen:
+                walk(callee, stack, seen, share * edge_ratio)
+
+    for func, (cc, nc, tt, ct, callers) in raw.items():
+        if not callers:
+            walk(func, '', frozenset(), ct)
+    return stacks
+
+
+def write_collapsed(stats, filename):
+    """Write collapsed stacks (microseconds) in the format flamegraph.pl expects"""
+    with open(filename, 'w') as f:
+        for stack, seconds in sorted(collapse_stats(stats).items()):
+            micros = int(seconds * 1e6)
+            if micros > 0:
+                f.write(f'{stack} {micros}\n')
+
+
+class AllocationTracer:
+    """Instrumentation sink attributing tracemalloc allocations to stages
+
+    A snapshot is taken when a stage starts and compared with one taken when
+    it ends, so the report shows allocation sites per stage. Taking snapshots
+    is slow; only use this while profiling.
+
+    Args:
+        forward (callable): sink to pass every event on to
+    """
+
+    def __init__(self, forward=None):
+        self.forward = forward
+        self.sites = defaultdict(lambda: defaultdict(lambda: [0, 0]))
+        self._started = []
+        # Allocations of the tracer itself: snapshots, and the pattern
+        # matching Filter does, which compiles and caches regexes
+        self._filters = [tracemalloc.Filter(False, filename)
+                         for filename in (tracemalloc.__file__, fnmatch.__file__, __file__,
+                                          os.path.join(os.path.dirname(re.__file__), '*'))]
+
+    def __call__(self, event, name, value):
+        if event == 'start':
+            self._started.append(tracemalloc.take_snapshot())
+        elif event == 'end' and self._started:
+            before = self._started.pop()
+            after = tracemalloc.take_snapshot()
+            # Filter only once the stage is over, so filtering is not traced as part of it
+            before = before.filter_traces(self._filters)
+            after = after.filter_traces(self._filters)
+            for diff in after.compare_to(before, 'lineno'):
+                if diff.size_diff > 0:
+                    site = self.sites[name][str(diff.traceback)]
+                    site[0] += diff.size_diff
+                    site[1] += diff.count_diff
+        if self.forward is not None:
+            self.forward(event, name, value)
+
+    def report(self, top=10, file=None):
+        """Print the top allocation sites of each stage"""
+        file = file or sys.stderr
+        for stage, sites in sorted(self.sites.items()):
+            print(f'Top allocations in {stage}:', file=file)
+            ranked = sorted(sites.items(), key=lambda item: item[1][0], reverse=True)
+            for site, (size, count) in ranked[:top]:
+                print(f'  {size / 1024:10.1f} KiB {count:8d} blocks  {site}', file=file)
+
+
+def profile(func, profile_path=None, trace_alloc=False, top=10):
+    """Run func under cProfile and/or tracemalloc
+
+    With profile_path, writes pstats data to profile_path and collapsed stacks
+    to profile_path + '.folded'. With trace_alloc, prints the top allocation
+    sites per stage to stderr. Snapshots taken for trace_alloc show up in the
+    cProfile timings when both are enabled.
+
+    Args:
+        func (callable): workload to run
+        profile_path (str): pstats output file
+        trace_alloc (bool): trace allocations per stage
+        top (int): allocation sites to report per stage
+
+    Returns:
+        the return value of func
+    """
+    tracer = None
+    if trace_alloc:
+        tracer = AllocationTracer(metrics.get_sink())
+        metrics.set_sink(tracer)
+        tracemalloc.start()
+
+    profiler = cProfile.Profile() if profile_path else None
+    try:
+        if profiler is not None:
+            profiler.enable()
+        try:
+            return func()
+        finally:
+            if profiler is not None:
+                profiler.disable()
+    finally:
+        if tracer is not None:
+            tracemalloc.stop()
+            metrics.set_sink(tracer.forward)
+            tracer.report(top)
+        if profiler is not None:
+            profiler.dump_stats(profile_path)
+            write_collapsed(pstats.Stats(profiler), profile_path + '.folded')
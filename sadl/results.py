@@ -0,0 +1,174 @@
+import atexit
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+
+def to_pixels(output, width, height, pad=255):
+    """Pad or truncate decoder output to a (height, width) uint8 array
+
+    Args:
+        output (bytes-like, numpy.ndarray or ImageResult): decoded pixels
+        width (int): image width
+        height (int): image height
+        pad (int): gray level of missing pixels
+
+    Returns:
+        numpy.ndarray: uint8 array of shape (height, width)
+    """
+    if isinstance(output, ImageResult):
+        output = output.pixels
+    flat = output.astype(np.uint8, copy=False).ravel() if isinstance(output, np.ndarray) else np.frombuffer(output, dtype=np.uint8)
+    if len(flat) >= width * height:
+        return flat[:width * height].reshape(height, width)
+    pixels = np.full(width * height, pad, dtype=np.uint8)
+    pixels[:len(flat)] = flat
+    return pixels.reshape(height, width)
+
+
+class ImageResult:
+    """A decoded grayscale image kept in memory until it is saved
+
+    Attributes:
+        name (str): what produced the image, also the default file name
+        pixels (numpy.ndarray): uint8 array of shape (height, width)
+        metadata (dict): anything else the decoder wants to report
+    """
+    __slots__ = ('name', 'pixels', 'metadata')
+
+    def __init__(self, name, pixels, **metadata):
+        self.name = name
+        self.pixels = pixels
+        self.metadata = metadata
+
+    @classmethod
+    def from_bytes(cls, name, data, width, height, pad=255, **metadata):
+        """Build a result from row-major pixels, padded or truncated to width x height"""
+        return cls(name, to_pixels(data, width, height, pad), **metadata)
+
+    @property
+    def width(self):
+        return self.pixels.shape[1]
+
+    @property
+    def height(self):
+        return self.pixels.shape[0]
+
+    def to_image(self):
+        """Return the pixels as a PIL image"""
+        from PIL import Image
+
+        return Image.fromarray(self.pixels)
+
+    def __repr__(self):
+        return f'ImageResult({self.name!r}, {self.width}x{self.height})'
+
+
+class ImageWriter:
+    """Write image results to a directory on a background thread pool
+
+    save() returns the path right away; call flush() before reading the
+    files back or reporting them as written. Errors from a write are raised
+    by the next flush(). The default writer is closed at exit, and write
+    errors still pending then are printed to stderr.
+
+    Args:
+        directory (str): output directory, created on the first write
+        workers (int): number of writer threads
+    """
+
+    def __init__(self, directory='.', workers=2):
+        self.directory = directory
+        self._executor = ThreadPoolExecutor(workers)
+        self._pending = []
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _write(self, result, path):
+        os.makedirs(self.directory, exist_ok=True)
+        result.to_image().save(path)
+
+    def save(self, result, filename=None):
+        """Queue a result for writing
+
+        Args:
+            result (ImageResult): image to write
+            filename (str): file name in the output directory; the format
+                follows the extension, '.png' is added if there is none
+
+        Returns:
+            str: path the image is written to
+        """
+        filename = filename or result.name
+        if not os.path.splitext(filename)[1]:
+            filename += '.png'
+        path = os.path.join(self.directory, filename)
+        future = self._executor.submit(self._write, result, path)
+        with self._lock:
+            self._pending.append(future)
+        return path
+
+    def flush(self):
+        """Wait for queued writes and raise the first error"""
+        with self._lock:
+            pending, self._pending = self._pending, []
+        for future in pending:
+            future.result()
+
+    def close(self):
+        """Finish queued writes and stop the threads"""
+        try:
+            self.flush()
+        finally:
+            self._executor.shutdown()
+
+
+_default_writer = None
+
+
+def configure(directory='.', workers=2):
+    """Replace the writer used by save()
+
+    Args:
+        directory (str): output directory
+        workers (int): number of writer threads
+
+    Returns:
+        ImageWriter: the new default writer
+    """
+    global _default_writer
+    if _default_writer is not None:
+        _default_writer.close()
+    _default_writer = ImageWriter(directory, workers)
+    return _default_writer
+
+
+@atexit.register
+def _close_default_writer():
+    # Scripts that never flush still get their images, and hear about failed writes
+    if _default_writer is None:
+        return
+    try:
+        _default_writer.close()
+    except Exception as e:
+        print(f'sadl.results: failed to write image: {e}', file=sys.stderr)
+
+
+def get_writer():
+    """Return the default writer, creating it on first use"""
+    if _default_writer is None:
+        configure()
+    return _default_writer
+
+
+def save(result, filename=None):
+    """Queue a result on the default writer; see ImageWriter.save"""
+    return get_writer().save(result, filename)
@@ -0,0 +1,178 @@
+import numpy as np
+
+
+def pairs(data, limit=None, order='value-count', marker=None, min_count=1, max_count=255):
+    """Tokenize (value, count) pairs
+
+    A pair whose count is outside [min_count, max_count] is not a run; its
+    first byte is copied as a literal and tokenizing resumes at the next byte.
+
+    Args:
+        data (bytes-like): encoded stream
+        limit (int): stop once this many bytes are produced
+        order (str): 'value-count' or 'count-value'
+        marker (int): if set, only pairs preceded by this byte are runs
+        min_count (int): smallest valid run length
+        max_count (int): largest valid run length
+
+    Returns:
+        (list, list): run values and run lengths
+    """
+    values = []
+    counts = []
+    produced = 0
+    size = 2 if marker is None else 3
+    i = 0
+    while i < len(data) and (limit is None or produced < limit):
+        if i + size <= len(data) and (marker is None or data[i] == marker):
+            first, second = data[i + size - 2], data[i + size - 1]
+            value, count = (first, second) if order == 'value-count' else (second, first)
+            if min_count <= count <= max_count:
+                values.append(value)
+                counts.append(count)
+                produced += count
+                i += size
+                continue
+        values.append(data[i])
+        counts.append(1)
+        produced += 1
+        i += 1
+    return values, counts
+
+
+def headers(data, limit=None, literal_bias=1, end=None, keep_truncated=False):
+    """Tokenize PackBits-style header bytes
+
+    A header h below 0x80 copies the next h + literal_bias bytes, any other
+    header repeats the next byte 256 - h times.
+
+    Args:
+        data (bytes-like): encoded stream
+        limit (int): stop once this many bytes are produced
+        literal_bias (int): added to the header of a literal run
+        end (int): header that ends the stream
+        keep_truncated (bool): copy the header of a run cut off by the end of
+            the stream as a literal instead of dropping it
+
+    Returns:
+        (list, list): run values and run lengths
+    """
+    values = []
+    counts = []
+    produced = 0
+    i = 0
+    while i < len(data) and (limit is None or produced < limit):
+        header = data[i]
+        if i + 1 < len(data) and header == end:
+            break
+        if header < 0x80:
+            length = header + literal_bias
+            if i + 1 < len(data) and i + 1 + length <= len(data):
+                values += data[i + 1: i + 1 + length]
+                counts += [1] * length
+                produced += length
+                i += 1 + length
+                continue
+        elif i + 1 < len(data):
+            values.append(data[i + 1])
+            counts.append(256 - header)
+            produced += 256 - header
+            i += 2
+            continue
+        if keep_truncated:
+            values.append(header)
+            counts.append(1)
+            produced += 1
+        i += 1
+    return values, counts
+
+
+def triples(data, limit=None, max_count=99):
+    """Tokenize 3-byte runs of either [count, value, x] or [value, count, x]
+
+    [count, value] is tried first. A non-zero value with a count up to
+    max_count is a run; otherwise the first byte is copied as a literal.
+
+    Args:
+        data (bytes-like): encoded stream
+        limit (int): stop once this many bytes are produced
+        max_count (int): largest valid run length
+
+    Returns:
+        (list, list): run values and run lengths
+    """
+    values = []
+    counts = []
+    produced = 0
+    i = 0
+    while i < len(data) and (limit is None or produced < limit):
+        if i + 2 < len(data):
+            first, second = data[i], data[i + 1]
+            if first <= max_count and second > 0:
+                values.append(second)
+                counts.append(first)
+                produced += first
+                i += 3
+                continue
+            if second <= max_count and first > 0:
+                values.append(first)
+                counts.append(second)
+                produced += second
+                i += 3
+                continue
+        values.append(data[i])
+        counts.append(1)
+        produced += 1
+        i += 1
+    return values, counts
+
+
+# name -> (tokenizer, options)
+SCHEMES = {
+    'value-count': (pairs, {'order': 'value-count'}),
+    'count-value': (pairs, {'order': 'count-value'}),
+    'marker': (pairs, {'order': 'count-value', 'marker': 0x00}),
+    'packbits': (headers, {}),
+    'differential': (headers, {'literal_bias': 0, 'end': 0x00, 'keep_truncated': True}),
+    'triples': (triples, {}),
+}
+
+
+def expand(values, counts, limit=None):
+    """Expand runs with np.repeat
+
+    Args:
+        values (sequence): run values
+        counts (sequence): run lengths
+        limit (int): maximum output size; the last run is cut short to fit
+
+    Returns:
+        numpy.ndarray: uint8 array
+    """
+    values = np.asarray(values, dtype=np.uint8)
+    counts = np.asarray(counts, dtype=np.intp)
+    ends = np.cumsum(counts)
+    size = int(ends[-1]) if len(ends) else 0
+    if limit is not None and size > limit:
+        last = int(np.searchsorted(ends, limit))
+        values = values[:last + 1]
+        counts = counts[:last + 1].copy()
+        counts[last] -= ends[last] - limit
+    return np.repeat(values, counts)
+
+
+def decode(data, scheme, limit=None, **options):
+    """Decode a run-length encoded stream
+
+    Args:
+        data (bytes-like): encoded stream
+        scheme (str): name in SCHEMES
+        limit (int): maximum output size, which also stops tokenizing early
+        **options: override the tokenizer options of the scheme
+
+    Returns:
+        numpy.ndarray: uint8 array of at most limit bytes
+    """
+    tokenizer, defaults = SCHEMES[scheme]
+    values, counts = tokenizer(data, limit, **dict(defaults, **options))
+    return expand(values, counts, limit)
@@ -1,15 +1,72 @@
 import argparse
+import base64
 from sadl import *
 import sys
 import os
 
+def serve():
+    parser = argparse.ArgumentParser(prog='sadltool serve', description='Run a warm sadltool daemon on a Unix domain socket or as an HTTP service.')
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument('--socket', type=str, help='Path of the Unix domain socket to listen on')
+    group.add_argument('--http', type=str, help='HOST:PORT to serve the HTTP decoding service on')
+    parser.add_argument('-w', '--workers', default=None, type=int, help='Number of HTTP worker processes (default: CPU count)')
+    parser.add_argument('-l', '--license', default='', type=str, help='The license key is required for decoding PDF417')
+    args = parser.parse_args(sys.argv[2:])
+    
+    if args.socket:
+        from sadl.daemon import serve
+        serve(args.socket, args.license)
+    else:
+        from sadl.httpd import serve
+        host, _, port = args.http.rpartition(':')
+        serve(host or '127.0.0.1', int(port), args.workers, args.license)
+
+def forward(socket_path, source, types, encrypted, license):
+    from sadl.daemon import Client
+    
+    if types == 1:
+        data = os.path.abspath(source).encode('utf-8')
+    else:
+        data = Path(source).read_bytes()
+        
+    with Client(socket_path) as client:
+        ok, text = client.request(types, encrypted, license, data)
+    print(text)
+    if not ok:
+        sys.exit(1)
+
+def run(socket_path, source, types, encrypted, license):
+    if socket_path:
+        forward(socket_path, source, types, encrypted, license)
+    elif types == 1:
+        dl = parse_file(source, encrypted, license)
+        print(dl)
+    elif types == 2 or types == 3:
+        if types == 2:
+            with open(source, 'r') as f:
+                data = base64.b64decode(f.read())
+        else:
+            data = Path(source).read_bytes()
+        result = triage([data], encrypted)[0]
+        if not result.ok:
+            print(f'Not a driving license payload: {result.reason}')
+            sys.exit(1)
+        dl = parse_bytes(data, encrypted)
+        print(dl)
+
 def sadltool():
+    if len(sys.argv) > 1 and sys.argv[1] == 'serve':
+        serve()
+        return
     
     parser = argparse.ArgumentParser(description='Decode, decrypt and parse South Africa driving license.')
     parser.add_argument('source', help='A source file containing information of driving license.')
     parser.add_argument('-t', '--types', default=1, type=int, help='Specify the source type. 1: PDF417 image 2: Base64 string 3: Raw bytes')
     parser.add_argument('-e', '--encrypted', default=1, type=int, help='Is the source encrypted? 0: No 1: Yes')
     parser.add_argument('-l', '--license', default='', type=str, help='The license key is required for decoding PDF417')
+    parser.add_argument('-s', '--socket', default='', type=str, help='Forward the request to a daemon started with "sadltool serve --socket PATH"')
+    parser.add_argument('--profile', default='', type=str, help='Run under cProfile, writing pstats to PATH and collapsed stacks to PATH.folded')
+    parser.add_argument('--trace-alloc', action='store_true', help='Report the top allocation sites per stage on stderr')
     
     if len(sys.argv) == 1:
         parser.print_help()
@@ -29,18 +86,11 @@ def sadltool():
             print('Source not found')
             exit(-1)
             
-        if types == 1:
-            dl = parse_file(source, encrypted, license)
-            print(dl)
-        elif types == 2:
-            with open(source, 'r') as f:
-                source = f.read()
-                dl = parse_base64(source, encrypted)
-                print(dl)
-        elif types == 3:
-            data = Path(source).read_bytes()
-            dl = parse_bytes(data, encrypted)
-            print(dl)
+        if args.profile or args.trace_alloc:
+            from sadl.profiling import profile
+            profile(lambda: run(args.socket, source, types, encrypted, license), args.profile, args.trace_alloc)
+        else:
+            run(args.socket, source, types, encrypted, license)
             
     except Exception as err:
         print(err)
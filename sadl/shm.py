@@ -0,0 +1,163 @@
+import multiprocessing
+import os
+import queue
+from collections import deque
+from multiprocessing.shared_memory import SharedMemory
+
+from . import decrypt_into, metrics, parse_data, triage
+
+SLOT_SIZE = 720
+RESULT_SIZE = 714
+
+_input = None
+_output = None
+
+
+def _attach(input_name, output_name):
+    global _input, _output
+    _input = SharedMemory(input_name)
+    _output = SharedMemory(output_name)
+
+
+def _decrypt_slot(slot):
+    data = _input.buf[slot * SLOT_SIZE: (slot + 1) * SLOT_SIZE]
+    out = _output.buf[slot * RESULT_SIZE: (slot + 1) * RESULT_SIZE]
+    try:
+        decrypt_into(data, out).release()
+    finally:
+        data.release()
+        out.release()
+    return slot
+
+
+class SharedDecryptor:
+    """Process pool that exchanges payloads through shared memory
+
+    Encrypted payloads are copied into a ring of fixed 720-byte slots and the
+    714 decrypted bytes are written back into a matching result arena. Only
+    the slot number crosses the process boundary, so nothing is pickled.
+    When every slot is in flight, submitters block until one is released.
+    Safe to use from several threads at once.
+
+    Args:
+        workers (int): number of worker processes
+        slots (int): number of slots in the ring
+    """
+
+    def __init__(self, workers=None, slots=None):
+        workers = workers or os.cpu_count() or 1
+        self.slots = slots or workers * 4
+        self._input = SharedMemory(create=True, size=self.slots * SLOT_SIZE)
+        self._output = SharedMemory(create=True, size=self.slots * RESULT_SIZE)
+        self._free = queue.Queue()
+        for slot in range(self.slots):
+            self._free.put(slot)
+        self._pool = multiprocessing.Pool(workers, _attach, (self._input.name, self._output.name))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """Stop the workers and release the shared memory"""
+        self._pool.terminate()
+        self._pool.join()
+        for shm in (self._input, self._output):
+            shm.close()
+            shm.unlink()
+
+    def submit(self, data):
+        """Copy a 720-byte payload into a free slot and start decrypting it
+
+        Returns:
+            (int, AsyncResult): slot number and pending result
+        """
+        slot = self._free.get()
+        start = slot * SLOT_SIZE
+        self._input.buf[start: start + SLOT_SIZE] = data
+        return slot, self._pool.apply_async(_decrypt_slot, (slot,))
+
+    def collect(self, slot, pending):
+        """Wait for a submitted slot and return its decrypted bytes
+
+        Returns:
+            bytes: decrypted data
+        """
+        try:
+            pending.get()
+            start = slot * RESULT_SIZE
+            return bytes(self._output.buf[start: start + RESULT_SIZE])
+        finally:
+            self._free.put(slot)
+
+    def decrypt(self, data):
+        """Decrypt one payload, blocking until it is done
+
+        Args:
+            data (bytes): 720 bytes of encrypted data
+
+        Returns:
+            bytes: decrypted data
+        """
+        return self.collect(*self.submit(data))
+
+    def map(self, payloads):
+        """Decrypt payloads keeping every slot busy
+
+        Args:
+            payloads (iterable): 720-byte encrypted payloads
+
+        Yields:
+            bytes: decrypted data, in input order
+        """
+        pending = deque()
+        for data in payloads:
+            if len(pending) == self.slots:
+                yield self.collect(*pending.popleft())
+            pending.append(self.submit(data))
+        while pending:
+            yield self.collect(*pending.popleft())
+
+
+def parse_batch(payloads, encrypted=True, workers=None, slots=None):
+    """Parse many payloads, decrypting them through shared memory
+
+    Payloads rejected by triage() are never sent to the workers.
+
+    Args:
+        payloads (list): raw payloads
+        encrypted (bool): are the payloads encrypted
+        workers (int): number of worker processes
+        slots (int): number of slots in the ring
+
+    Returns:
+        list: Driving license objects, None where triage rejected the payload
+        or parsing failed
+    """
+    if not encrypted:
+        return [_parse(data) for data in payloads]
+
+    results = [None] * len(payloads)
+    valid = []
+    normalized = []
+    for i, result in enumerate(triage(payloads)):
+        if result.ok:
+            valid.append(i)
+            normalized.append(result.data)
+        else:
+            metrics.failure(result.reason)
+    with SharedDecryptor(workers, slots) as decryptor:
+        for i, data in zip(valid, decryptor.map(normalized)):
+            results[i] = _parse(data)
+    return results
+
+
+def _parse(data):
+    # One bad payload should not cost the rest of the batch
+    try:
+        return parse_data(data)
+    except Exception:
+        metrics.failure('parse_error')
+        return None
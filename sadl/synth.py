@@ -0,0 +1,251 @@
+import argparse
+import datetime
+import random
+import sys
+
+from . import DrivingLicense, parse_data
+
+# Decrypted payloads are 5 x 128 + 74 bytes
+PAYLOAD_SIZE = 714
+
+# Start of the bytes before the 0x82 section marker, copied from the first
+# encrypted sample in the repository. Their meaning is not documented.
+# encode() follows them with 03 00, the length of section 1 (strings and ID
+# number), 01 and the length of section 2 (ID number type and dates), which
+# is what every sample has there. parse_data skips the preamble.
+PREAMBLE = bytes.fromhex('010203040502e627')
+
+# Image section header: 'WI', one unknown byte, big-endian width and height
+IMAGE_MAGIC = b'WI\x04'
+
+VEHICLE_CODES = ['B', 'EB', 'C1', 'EC1', 'C', 'EC', 'A', 'A1']
+VEHICLE_CODE_WEIGHTS = [60, 12, 10, 5, 4, 4, 3, 2]
+PRDP_CODES = ['G', 'P', 'G,P', 'G,P,D']
+DRIVER_RESTRICTIONS = ['00', '10', '01', '20', '11']
+DRIVER_RESTRICTION_WEIGHTS = [80, 15, 2, 2, 1]
+SURNAMES = ['DLAMINI', 'NKOSI', 'NDLOVU', 'KHUMALO', 'MOKOENA', 'MAHLANGU', 'SITHOLE', 'MTHEMBU',
+            'NAIDOO', 'BOTHA', 'VAN DER MERWE', 'PRETORIUS', 'SMITH', 'PILLAY', 'MOLEFE', 'ZULU',
+            'MOTAUNG', 'NGCOBO', 'COETZEE', 'VAN WYK', 'JACOBS', 'LE ROUX', 'MAZIBUKO', 'SANDERS']
+
+
+def _strings(values):
+    # readStrings reads 4 slots: a value ending in 0xe0 fills one, a value
+    # ending in 0xe1 fills two and a bare 0xe1 is one empty slot
+    if len(values) > 4:
+        raise ValueError('At most 4 values fit in a string list')
+    out = bytearray()
+    for i, value in enumerate(values):
+        out += value.encode('ascii')
+        out.append(0xe0 if i == 3 or i < len(values) - 1 else 0xe1)
+    out += b'\xe1' * max(0, 4 - len(values) - (1 if values else 0))
+    return out
+
+
+def _date_nibbles(date):
+    if date == '':
+        return [10]
+    digits = date.replace('/', '')
+    if len(digits) != 8 or not digits.isdigit():
+        raise ValueError(f'Dates must be YYYY/MM/DD: {date!r}')
+    return [int(c) for c in digits]
+
+
+def _pair_nibbles(value):
+    if len(value) != 2 or not value.isdigit():
+        raise ValueError(f'Expected two digits: {value!r}')
+    return [int(value[0]), int(value[1])]
+
+
+def encode(dl, image=b''):
+    """Serialize a driving license into the decrypted layout parse_data reads
+
+    Sections 1 and 2 match real payloads byte for byte. The preamble and the
+    byte after the 0x82 marker are only partly understood (see PREAMBLE), so
+    they match the first encrypted sample but not every real payload.
+
+    Args:
+        dl (DrivingLicense): any object with the DrivingLicense attributes
+        image (bytes): image data placed after the image header, padded or
+            truncated to fill the payload
+
+    Returns:
+        bytes: PAYLOAD_SIZE bytes of unencrypted license data
+    """
+    if len(dl.idNumber) != 13:
+        raise ValueError(f'ID number must have 13 characters: {dl.idNumber!r}')
+    if len(dl.licenseCodeIssueDates) > 4:
+        raise ValueError('At most 4 license code issue dates')
+
+    # Section 1: strings and the ID number
+    section = bytearray(_strings(dl.vehicleCodes))
+    section += dl.surname.encode('ascii') + b'\xe0'
+    if dl.PrDPCode:
+        section += dl.initials.encode('ascii') + b'\xe0' + dl.PrDPCode.encode('ascii') + b'\xe0'
+    else:
+        section += dl.initials.encode('ascii') + b'\xe1'
+    section += dl.idCountryOfIssue.encode('ascii') + b'\xe0'
+    section += dl.licenseCountryOfIssue.encode('ascii') + b'\xe0'
+    section += _strings(dl.vehicleRestrictions)
+    section += dl.licenseNumber.encode('ascii') + b'\xe0'
+    section += dl.idNumber.encode('ascii')
+
+    # Section 2: nibble-packed binary data, padded with 0xa to a whole byte
+    strings_size = len(section)
+    section.append(int(dl.idNumberType))
+    nibbles = []
+    dates = list(dl.licenseCodeIssueDates) + [''] * (4 - len(dl.licenseCodeIssueDates))
+    for date in dates:
+        nibbles += _date_nibbles(date)
+    nibbles += _pair_nibbles(dl.driverRestrictionCodes)
+    nibbles += _date_nibbles(dl.PrDPermitExpiryDate)
+    nibbles += _pair_nibbles(dl.licenseIssueNumber)
+    nibbles += _date_nibbles(dl.birthdate)
+    nibbles += _date_nibbles(dl.licenseIssueDate)
+    nibbles += _date_nibbles(dl.licenseExpiryDate)
+    nibbles += [0, 1] if dl.gender == 'male' else [0, 2]
+    if len(nibbles) % 2:
+        nibbles.append(10)
+    packed = bytes((nibbles[i] << 4) | nibbles[i + 1] for i in range(0, len(nibbles), 2))
+    if 0x57 in packed:
+        # parse_data stops at the first 0x57, so this record cannot be represented
+        raise ValueError('Binary section contains the 0x57 image marker')
+    section += packed
+
+    # Section 3: image
+    # The byte after 0x82 matches the length of sections 1 and 2 in the first
+    # sample but not in images/dl.raw or the second sample; parse_data ignores it
+    header = PREAMBLE + bytes([0x03, 0x00, strings_size, 0x01, len(section) - strings_size, 0x82, len(section)])
+    image_header = IMAGE_MAGIC + dl.image_width.to_bytes(2, 'big') + dl.image_height.to_bytes(2, 'big')
+    payload = header + section + image_header
+    if len(payload) > PAYLOAD_SIZE:
+        raise ValueError(f'Record needs {len(payload)} bytes, more than {PAYLOAD_SIZE}')
+    filler = PAYLOAD_SIZE - len(payload)
+    return payload + image[:filler] + bytes(filler - len(image[:filler]))
+
+
+def _date(day):
+    return day.strftime('%Y/%m/%d')
+
+
+def _id_number(rng, birthdate, male):
+    digits = birthdate.strftime('%y%m%d') + f'{rng.randrange(5000, 10000) if male else rng.randrange(0, 5000):04d}'
+    digits += '08' if rng.random() < 0.97 else '18'
+    # Luhn check digit
+    total = 0
+    for i, c in enumerate(reversed(digits)):
+        d = int(c)
+        if i % 2 == 0:
+            d *= 2
+            if d > 9:
+                d -= 9
+        total += d
+    return digits + str((10 - total % 10) % 10)
+
+
+def random_license(rng, today=datetime.date(2024, 1, 1)):
+    """Draw one driving license with realistic field distributions
+
+    Args:
+        rng (random.Random): source of randomness
+        today (datetime.date): reference date for ages and validity periods
+
+    Returns:
+        DrivingLicense: license whose dates and ID number are consistent
+    """
+    count = rng.choices([1, 2, 3, 4], [70, 20, 7, 3])[0]
+    vehicleCodes = []
+    while len(vehicleCodes) < count:
+        code = rng.choices(VEHICLE_CODES, VEHICLE_CODE_WEIGHTS)[0]
+        if code not in vehicleCodes:
+            vehicleCodes.append(code)
+
+    male = rng.random() < 0.55
+    birth = today - datetime.timedelta(days=rng.randrange(18 * 365, 80 * 365))
+    issued = today - datetime.timedelta(days=rng.randrange(0, 5 * 365))
+    adult = birth.replace(year=birth.year + 18) if not (birth.month == 2 and birth.day == 29) else birth.replace(year=birth.year + 18, day=28)
+    codeDates = []
+    for _ in vehicleCodes:
+        first = adult + datetime.timedelta(days=rng.randrange(0, max(1, (issued - adult).days)))
+        codeDates.append(_date(first))
+
+    PrDPCode = ''
+    PrDPermitExpiryDate = ''
+    if rng.random() < 0.12:
+        PrDPCode = rng.choice(PRDP_CODES)
+        PrDPermitExpiryDate = _date(issued + datetime.timedelta(days=2 * 365))
+
+    initials = ''.join(rng.choice('ABCDEFGHIJKLMNOPQRSTUVWXYZ') for _ in range(rng.choices([1, 2, 3], [55, 35, 10])[0]))
+    licenseNumber = f'{rng.randrange(10000):04d}{rng.randrange(1000000):06d}' + ''.join(rng.choice('ABCDEFGHJKLMNPQRSTUVWXYZ0123456789') for _ in range(2))
+    expiry = issued.replace(year=issued.year + 5) - datetime.timedelta(days=1) if not (issued.month == 2 and issued.day == 29) else issued.replace(year=issued.year + 5, day=28)
+
+    return DrivingLicense(
+        vehicleCodes, rng.choice(SURNAMES), initials, PrDPCode, 'ZA', 'ZA', ['0'] * len(vehicleCodes),
+        licenseNumber, _id_number(rng, birth, male), '02', codeDates,
+        rng.choices(DRIVER_RESTRICTIONS, DRIVER_RESTRICTION_WEIGHTS)[0], PrDPermitExpiryDate,
+        f'{rng.choices([1, 2, 3, 4], [60, 25, 10, 5])[0]:02d}', _date(birth), _date(issued), _date(expiry),
+        'male' if male else 'female', 250, 200)
+
+
+def generate_licenses(count=None, seed=0):
+    """Yield random driving licenses that encode() accepts
+
+    Args:
+        count (int): number of licenses, or None for an endless stream
+        seed (int): random seed; the same seed yields the same licenses
+
+    Yields:
+        DrivingLicense
+    """
+    rng = random.Random(seed)
+    produced = 0
+    while count is None or produced < count:
+        dl = random_license(rng)
+        try:
+            encode(dl)
+        except ValueError:
+            # About 1 in 20 draws packs a 0x57 byte into the dates
+            continue
+        produced += 1
+        yield dl
+
+
+def generate(count=None, seed=0):
+    """Yield unencrypted payloads for load testing parse_data
+
+    The image section is filled with random bytes from a stream of its own,
+    seeded from seed, so it does not track the license field draws.
+
+    Args:
+        count (int): number of payloads, or None for an endless stream
+        seed (int): random seed; the same seed yields the same payloads
+
+    Yields:
+        bytes: PAYLOAD_SIZE bytes each
+    """
+    rng = random.Random(f'{seed}:image')
+    for dl in generate_licenses(count, seed):
+        yield encode(dl, rng.randbytes(PAYLOAD_SIZE))
+
+
+def main():
+    parser = argparse.ArgumentParser(prog='python -m sadl.synth', description='Generate synthetic unencrypted driving license payloads.')
+    parser.add_argument('-n', '--count', default=1000, type=int, help='Number of payloads')
+    parser.add_argument('-s', '--seed', default=0, type=int, help='Random seed')
+    parser.add_argument('-o', '--output', help=f'File to write the payloads to, back to back in {PAYLOAD_SIZE}-byte records')
+    parser.add_argument('--verify', action='store_true', help='Check that parse_data returns every generated license unchanged')
+    args = parser.parse_args()
+
+    if args.verify:
+        for i, dl in enumerate(generate_licenses(args.count, args.seed)):
+            if vars(parse_data(encode(dl))) != vars(dl):
+                print(f'Round trip mismatch for record {i}:\n{dl}')
+                sys.exit(1)
+        print(f'{args.count} records round-tripped')
+    if args.output:
+        with open(args.output, 'wb') as f:
+            for payload in generate(args.count, args.seed):
+                f.write(payload)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,173 @@
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import numpy as np
+
+from .pixels import unpack_pixels
+from .results import ImageResult, get_writer, to_pixels
+from .rle import SCHEMES, decode
+
+# Neighbouring pixels further apart than this count as an edge
+EDGE_STEP = 32
+
+DECODERS = {}
+
+
+def decoder(name):
+    """Register a decoder func(data, width, height) under name"""
+    def register(func):
+        DECODERS[name] = func
+        return func
+    return register
+
+
+@decoder('direct')
+def _direct(data, width, height):
+    return data
+
+
+DECODERS.update({f'{bits}bit': lambda data, width, height, bits=bits: unpack_pixels(data, bits, width, height)
+                 for bits in (1, 2, 4)})
+DECODERS.update({f'rle_{scheme}': lambda data, width, height, scheme=scheme: decode(data, scheme, limit=width * height)
+                 for scheme in SCHEMES})
+
+
+class Candidate(ImageResult):
+    """Output of one decoder
+
+    Attributes:
+        name (str): decoder name
+        pixels (numpy.ndarray): uint8 array of shape (height, width)
+        metadata (dict): metadata of an ImageResult returned by the decoder
+        score (float): 0 to 1, higher is more image-like
+        stats (dict): entropy, edge_density and row_correlation
+    """
+    __slots__ = ('score', 'stats')
+
+    def __init__(self, name, pixels, score, stats, **metadata):
+        super().__init__(name, pixels, **metadata)
+        self.score = score
+        self.stats = stats
+
+    def __repr__(self):
+        return f'Candidate({self.name!r}, score={self.score:.3f})'
+
+
+def image_stats(pixels):
+    """Entropy, edge density and row correlation of a grayscale image
+
+    Args:
+        pixels (numpy.ndarray): uint8 array of shape (height, width)
+
+    Returns:
+        dict: entropy (0 to 1, of 8 bits), edge_density (fraction of
+        neighbouring pixel pairs differing by more than EDGE_STEP) and
+        row_correlation (mean Pearson correlation of adjacent rows)
+    """
+    counts = np.bincount(pixels.ravel(), minlength=256)
+    p = counts[counts > 0] / pixels.size
+    entropy = float(np.dot(p, np.log2(1 / p)) / 8)
+
+    signed = pixels.astype(np.int16)
+    edges = np.count_nonzero(np.abs(np.diff(signed, axis=1)) > EDGE_STEP) + np.count_nonzero(np.abs(np.diff(signed, axis=0)) > EDGE_STEP)
+    pairs = pixels.shape[0] * (pixels.shape[1] - 1) + (pixels.shape[0] - 1) * pixels.shape[1]
+    edge_density = float(edges / pairs) if pairs else 0.0
+
+    rows = pixels.astype(np.float32)
+    rows -= rows.mean(axis=1, keepdims=True)
+    above, below = rows[:-1], rows[1:]
+    norms = np.sqrt((above * above).sum(axis=1) * (below * below).sum(axis=1))
+    valid = norms > 0
+    row_correlation = float(((above * below).sum(axis=1)[valid] / norms[valid]).mean()) if valid.any() else 0.0
+
+    return {'entropy': entropy, 'edge_density': edge_density, 'row_correlation': row_correlation}
+
+
+def score(stats):
+    """Photo-likeness from image_stats: correlated rows, varied levels, few hard edges"""
+    return max(stats['row_correlation'], 0.0) * stats['entropy'] * (1 - stats['edge_density'])
+
+
+def _evaluate(name, func, data, width, height):
+    output = func(data, width, height)
+    if output is None:
+        return None
+    pixels = to_pixels(output, width, height)
+    stats = image_stats(pixels)
+    metadata = output.metadata if isinstance(output, ImageResult) else {}
+    return Candidate(name, pixels, score(stats), stats, **metadata)
+
+
+def run(data, width, height, decoders=None, top=3, threshold=None, workers=1):
+    """Evaluate decoders and return the best candidates
+
+    Each decoder takes (data, width, height) and returns pixels (bytes-like, a
+    NumPy array or an ImageResult) or None. Outputs are padded or truncated to
+    width x height and ranked by score(); decoders that raise or return None
+    are skipped.
+    Nothing is written to disk; see save().
+
+    By default the decoders run one after another on the calling thread. The
+    RLE decoders are pure Python and hold the GIL, so a thread pool
+    (workers > 1) only helps decoders that spend their time in NumPy or
+    native code; with it, threshold can only cancel decoders that have not
+    started yet.
+
+    Args:
+        data (bytes-like): image section
+        width (int): image width
+        height (int): image height
+        decoders (dict or list): name -> decoder, or (name, decoder) pairs;
+            defaults to DECODERS
+        top (int): number of candidates to keep
+        threshold (float): stop as soon as a candidate scores at least this
+        workers (int): thread pool size, or 1 to run on the calling thread
+
+    Returns:
+        list: up to top Candidate objects, best first
+    """
+    decoders = DECODERS if decoders is None else decoders
+    items = decoders.items() if isinstance(decoders, dict) else decoders
+
+    candidates = []
+    if workers == 1:
+        for name, func in items:
+            try:
+                candidate = _evaluate(name, func, data, width, height)
+            except Exception:
+                continue
+            if candidate is not None:
+                candidates.append(candidate)
+                if threshold is not None and candidate.score >= threshold:
+                    break
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            pending = {executor.submit(_evaluate, name, func, data, width, height) for name, func in items}
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    if future.exception() is None and future.result() is not None:
+                        candidates.append(future.result())
+                if threshold is not None and any(candidate.score >= threshold for candidate in candidates):
+                    for future in pending:
+                        future.cancel()
+                    break
+
+    # Ties go by name, so the result does not depend on which decoder finished first
+    candidates.sort(key=lambda candidate: (-candidate.score, candidate.name))
+    return candidates[:top]
+
+
+def save(candidates, prefix, writer=None):
+    """Queue candidates as PNG files named <prefix>_<name>.png
+
+    Args:
+        candidates (list): Candidate objects from run()
+        prefix (str): file name prefix
+        writer (ImageWriter): defaults to sadl.results.get_writer()
+
+    Returns:
+        list: (name, path) pairs
+    """
+    writer = writer or get_writer()
+    return [(candidate.name, writer.save(candidate, f"{prefix}_{candidate.name.lower().replace(' ', '_')}.png"))
+            for candidate in candidates]
@@ -36,6 +36,9 @@ setup(name='south-africa-driving-license',
           "Topic :: Software Development",
       ],
       install_requires=['dbr'],
+      extras_require={
+          'image': ['numpy', 'pillow'],
+      },
       entry_points={
           'console_scripts': ['sadltool=sadl.scripts:sadltool']
       },
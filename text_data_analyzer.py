@@ -1,4 +1,9 @@
 # Create: text_data_analyzer.py
+import numpy as np
+
+from sadl.bytestats import byte_stats
+from sadl.pixels import plot
+from sadl.results import ImageResult, save
 
 def analyze_text_data(raw_data):
     """Analyze the text content of the image data"""
@@ -7,9 +12,9 @@ def analyze_text_data(raw_data):
     
     # Convert to text
     try:
-        text = raw_data.decode('ascii', errors='replace')
+        text = bytes(raw_data).decode('ascii', errors='replace')
         print(f"Total characters: {len(text)}")
-        print(f"Printable characters: {sum(1 for c in text if c.isprintable() or c in ' \\t\\n\\r')}")
+        print(f"Printable characters: {byte_stats(raw_data).text}")
         print()
         
         # Split into lines based on common delimiters
@@ -47,7 +52,7 @@ def decode_as_structured_data(raw_data):
     print("\n🎯 STRUCTURED DATA ANALYSIS")
     print("=" * 50)
     
-    text = raw_data.decode('ascii', errors='replace')
+    text = bytes(raw_data).decode('ascii', errors='replace')
     
     # Check for common structured data patterns
     if text.startswith('{') or text.startswith('['):
@@ -105,37 +110,21 @@ def decode_as_biometric_template(raw_data):
     
     for name, check in template_indicators:
         try:
-            result = check(raw_data)
+            result = check(bytes(raw_data))
             print(f"{name}: {'✅' if result else '❌'}")
         except:
             print(f"{name}: ❌")
     
-    # Create a template visualization
-    output = bytearray(250 * 200)
-    for i in range(len(output)):
-        output[i] = 255  # White background
+    # Create a template visualization on a white background
+    output = np.full((200, 250), 255, dtype=np.uint8)
     
-    # Interpret as feature points
-    points_plotted = 0
-    for i in range(0, len(raw_data)-1, 2):
-        x = raw_data[i] % 250
-        y = raw_data[i+1] % 200
-        
-        # Draw a small cross at this point
-        for dy in range(-2, 3):
-            for dx in range(-2, 3):
-                x_pos = (x + dx) % 250
-                y_pos = (y + dy) % 200
-                pos = y_pos * 250 + x_pos
-                if pos < len(output):
-                    output[pos] = 0  # Black point
-                    points_plotted += 1
+    # Interpret as [x, y] feature points, each drawn as a 5x5 black square
+    data = np.frombuffer(raw_data, dtype=np.uint8)
+    pairs = len(data) // 2
+    points_plotted = plot(output, data[0:2 * pairs:2], data[1:2 * pairs:2], 0, radius=2)
     
     if points_plotted > 0:
-        filename = "biometric_template.png"
-        save_grayscale_image(bytes(output), 250, 200, filename)
-        print(f"💾 Biometric template visualization: {filename}")
-        return filename
+        return ImageResult("biometric_template", output, points=points_plotted)
     
     return None
 
@@ -144,7 +133,7 @@ def decode_as_license_metadata(raw_data):
     print("\n🎯 LICENSE METADATA ANALYSIS")
     print("=" * 50)
     
-    text = raw_data.decode('ascii', errors='replace')
+    text = bytes(raw_data).decode('ascii', errors='replace')
     
     # Look for common license data patterns
     license_patterns = {
@@ -170,17 +159,6 @@ def decode_as_license_metadata(raw_data):
     
     return None
 
-def save_grayscale_image(data, width, height, filename):
-    """Save grayscale image with proper size"""
-    from PIL import Image
-    if len(data) < width * height:
-        data = data + b'\\xFF' * (width * height - len(data))
-    elif len(data) > width * height:
-        data = data[:width * height]
-    
-    img = Image.frombytes('L', (width, height), bytes(data))
-    img.save(filename)
-
 def comprehensive_text_analysis(license_data):
     """Comprehensive analysis of the text data"""
     if not license_data or not license_data.image_bytes:
@@ -201,7 +179,10 @@ def comprehensive_text_analysis(license_data):
     decode_as_structured_data(raw_data)
     
     # 3. Biometric template analysis
-    template_file = decode_as_biometric_template(raw_data)
+    template = decode_as_biometric_template(raw_data)
+    template_file = save(template) if template else None
+    if template_file:
+        print(f"💾 Biometric template visualization: {template_file}")
     
     # 4. License metadata analysis
     metadata = decode_as_license_metadata(raw_data)